@@ -57,3 +57,110 @@ def play(values, result, history):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
+
+
+def square_position(x, y):
+    """Return the pixel offset of the square in column x and row y of the board image"""
+    return x * 57 + (38, 99, 159)[x // 3], y * 57 + (35, 100, 165)[y // 3]
+
+
+def _draw_square(screen, background_image, squares, box, value):
+    """Draw one square over a clean patch of the background and return its rect"""
+    number = int(value) if len(value) == 1 and value != '.' else None
+    key = box, number
+    if key not in squares:
+        x, y = cols.index(box[1]), rows.index(box[0])
+        startX, startY = square_position(x, y)
+        squares[key] = SudokuSquare.SudokuSquare(number, startX, startY, "N", x, y)
+    square = squares[key]
+    rect = pygame.Rect(square.offsetX, square.offsetY, 45, 40)
+    screen.blit(background_image, rect, rect)
+    square.draw()
+    return rect
+
+
+def replay(values, result, history, stride=1, fps=5, output=None):
+    """Replay the assignments of a solve, redrawing only the squares that change
+
+    Unlike `play`, the board is drawn once and each later frame only redraws
+    the squares assigned since the previous frame, and only those regions of
+    the window are updated.
+
+    Parameters
+    ----------
+    values(dict)
+        the starting puzzle in dictionary form
+
+    result(dict)
+        the solution returned by `solve`
+
+    history(History)
+        the history recorded while solving
+
+    stride(int)
+        the number of assignments applied between two frames
+
+    fps(int)
+        the frame rate of the window or of the GIF
+
+    output(string)
+        if given, the frames are rendered headlessly (no display is needed)
+        instead of in a window: a path ending in '.gif' writes an animated GIF
+        (requires Pillow), and any other path is a pattern such as
+        'frames/{:05d}.png' formatted with the frame number of each PNG
+
+    Returns
+    -------
+    int
+        the number of frames rendered
+    """
+    if output is not None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    values = dict(values)
+    assignments = reconstruct(result, history)
+    pygame.init()
+
+    size = width, height = 700, 700
+    screen = pygame.display.set_mode(size)
+    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
+    clock = pygame.time.Clock()
+    squares = {}
+    gif = output is not None and output.lower().endswith('.gif')
+    if gif:
+        from PIL import Image
+    frames = []
+
+    screen.blit(background_image, (0, 0))
+    for box in boxes:
+        _draw_square(screen, background_image, squares, box, values[box])
+    dirty = [screen.get_rect()]
+
+    for frame in range(len(range(0, len(assignments), stride)) + 1):
+        if output is None:
+            pygame.event.pump()
+            pygame.display.update(dirty)
+            clock.tick(fps)
+        elif gif:
+            # one byte per pixel instead of three, so long replays fit in memory
+            data = pygame.image.tostring(screen, "RGB")
+            frames.append(Image.frombytes("RGB", size, data).convert("P", palette=Image.ADAPTIVE))
+        else:
+            pygame.image.save(screen, output.format(frame))
+        changed = set()
+        for box, value in assignments[frame * stride:(frame + 1) * stride]:
+            values[box] = value
+            changed.add(box)
+        dirty = [_draw_square(screen, background_image, squares, box, values[box]) for box in changed]
+
+    if output is not None:
+        if gif:
+            frames[0].save(output, save_all=True, append_images=frames[1:], duration=1000 // fps, loop=0)
+        pygame.quit()
+        return frame + 1
+
+    # leave game showing until closed by user
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
@@ -0,0 +1,166 @@
+"""Vectorized constraint propagation over many diagonal Sudoku boards at once
+
+A batch of B boards is stored as a (B, 81, 9) boolean array where
+`candidates[b, i, d]` is True when digit d + 1 is still allowed in box
+`boxes[i]` of board b. The eliminate and only choice strategies are applied to
+every board at the same time with matrix products against precomputed peer and
+unit incidence matrices (derived from the `unitlist` and `peers` of
+solution.py), so the per-box Python loops of the dictionary solver only run
+for the boards that propagation alone cannot solve.
+
+Example:
+
+    results = solve_batch(open('puzzles.txt').read().split())
+"""
+import numpy as np
+
+from solution import ENGINES, peers, unitlist
+from utils import *
+
+DIGITS = np.array(list(cols))
+
+# candidate string for every 9-bit mask, with bit d set when digit d + 1 is allowed
+_BITS = 1 << np.arange(len(cols))
+_TEXT = [''.join(digit for d, digit in enumerate(cols) if mask >> d & 1)
+         for mask in range(1 << len(cols))]
+
+_index = {box: i for i, box in enumerate(boxes)}
+
+# PEERS[i, j] == 1 when boxes[j] is a peer of boxes[i]
+PEERS = np.zeros((len(boxes), len(boxes)), dtype=np.float32)
+for _box in boxes:
+    PEERS[_index[_box], [_index[peer] for peer in peers[_box]]] = 1
+
+# UNITS[u, i] == 1 when boxes[i] belongs to unitlist[u]
+UNITS = np.zeros((len(unitlist), len(boxes)), dtype=np.float32)
+for _u, _unit in enumerate(unitlist):
+    UNITS[_u, [_index[box] for box in _unit]] = 1
+
+
+def grids2array(grids):
+    """Convert a sequence of grid strings to a (B, 81, 9) candidate array
+
+    Parameters
+    ----------
+    grids(sequence)
+        strings representing sudoku grids, with '.' for empty boxes
+
+    Returns
+    -------
+    numpy.ndarray
+        a boolean array with every digit allowed in the empty boxes and only
+        the given digit allowed in the other boxes
+    """
+    codes = np.array([list(grid) for grid in grids]).reshape(-1, len(boxes))
+    given = codes != '.'
+    return np.where(given[..., None], codes[..., None] == DIGITS, True)
+
+
+def array2values(candidates):
+    """Convert one (81, 9) board of a candidate array to the dictionary representation"""
+    return dict(zip(boxes, [_TEXT[mask] for mask in candidates.dot(_BITS).tolist()]))
+
+
+def _incidence(matrix, mask):
+    """Multiply an incidence matrix with a (B, 81, 9) mask for every board and digit
+
+    Returns an array of shape (B, rows of matrix, 9) with the number of set
+    entries of `mask` in the boxes selected by each row of the matrix.
+    """
+    n, b, d = mask.shape[1], mask.shape[0], mask.shape[2]
+    flat = mask.transpose(1, 0, 2).reshape(n, b * d).astype(np.float32)
+    return matrix.dot(flat).reshape(-1, b, d).transpose(1, 0, 2)
+
+
+def eliminate(candidates):
+    """Remove the digit of every solved box from its peers, on every board
+
+    Returns
+    -------
+    numpy.ndarray
+        the updated candidate array
+    """
+    solved = candidates & (candidates.sum(axis=2) == 1)[..., None]
+    return candidates & ~(_incidence(PEERS, solved) > 0)
+
+
+def only_choice(candidates):
+    """Assign a digit to a box when no other box in one of its units allows it,
+    on every board
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        the updated candidate array, and a (B,) boolean array marking the boards
+        where some digit has no place left in a unit
+    """
+    counts = _incidence(UNITS, candidates)
+    unplaceable = (counts == 0).any(axis=(1, 2))
+    hidden = (_incidence(UNITS.T, counts == 1) > 0) & candidates
+    forced = hidden.any(axis=2)
+    return np.where(forced[..., None], hidden, candidates), unplaceable
+
+
+def propagate(candidates):
+    """Apply eliminate and only choice to every board until no board changes
+
+    Boards that stop changing, or that reach a contradiction, are dropped from
+    the working set, so later iterations only touch the boards still in play.
+
+    Parameters
+    ----------
+    candidates(numpy.ndarray)
+        a (B, 81, 9) boolean candidate array
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        the reduced candidate array, and a (B,) boolean array marking the boards
+        that reached a contradiction
+    """
+    candidates = candidates.copy()
+    failed = np.zeros(len(candidates), dtype=bool)
+    active = np.arange(len(candidates))
+    while len(active):
+        current = candidates[active]
+        reduced, unplaceable = only_choice(eliminate(current))
+        candidates[active] = reduced
+        dead = unplaceable | ~reduced.any(axis=2).all(axis=1)
+        failed[active] = dead
+        changed = (reduced != current).any(axis=(1, 2))
+        active = active[changed & ~dead]
+    return candidates, failed
+
+
+def solve_batch(grids, engine='bitmask'):
+    """Solve many puzzles with batched propagation and per-board search fallback
+
+    Parameters
+    ----------
+    grids(sequence)
+        strings representing sudoku grids
+
+    engine(string)
+        the engine in `solution.ENGINES` used for the boards that propagation
+        alone does not solve
+
+    Returns
+    -------
+    list
+        the solution of each puzzle in dictionary form, or False if it has none
+    """
+    grids = list(grids)
+    if not grids:
+        return []
+    candidates, failed = propagate(grids2array(grids))
+    solved = (candidates.sum(axis=2) == 1).all(axis=1)
+    search = ENGINES[engine]
+    results = []
+    for board, board_failed, board_solved in zip(candidates, failed, solved):
+        if board_failed:
+            results.append(False)
+        elif board_solved:
+            results.append(array2values(board))
+        else:
+            results.append(search(array2values(board)))
+    return results
@@ -0,0 +1,207 @@
+"""Benchmark the Sudoku solver engines over corpora of puzzle files
+
+Each corpus is a text file with one 81-character puzzle per line (e.g., local
+copies of the "top95" or "hardest" collections). Every puzzle is solved once
+per engine, and the harness reports the search nodes, backtracks and
+propagation steps counted by `SolverStats`, the wall time, and optionally the
+peak memory allocated while solving.
+
+Puzzles are solved with the diagonal rules defined in solution.py; use
+`--standard` for corpora of ordinary puzzles, with one of the engines in
+`solution.GEOMETRY_ENGINES`. Lines that are not a puzzle of the board (e.g., a
+header or a truncated line) are recorded as invalid instead of being solved.
+
+The counters mean different things for different engines, so compare them
+between runs of the same engine:
+
+- nodes: the boards reduced by the search (the root board and one per digit
+  tried) for search, incremental, trail and bitmask; the rows tried (one per
+  digit placed) for dlx, which does no separate propagation
+- backtracks: the digits tried that led to a contradiction, for every engine
+- propagations: the full-board sweeps of `reduce_puzzle` for search; the
+  boxes taken off the work queue for incremental, trail and bitmask; always 0
+  for dlx
+
+Example Usage:
+
+    $ python benchmark.py top95.txt hardest.txt -e search trail bitmask --csv runs.csv --json summary.json
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import time
+import tracemalloc
+
+from collections import namedtuple
+
+from solution import ENGINES, GEOMETRY_ENGINES, Geometry, SolverStats, read_grids, solve
+from utils import boxes, cols
+
+Run = namedtuple("Run", "corpus index engine status solved seconds nodes backtracks propagations peak_bytes")
+
+
+def percentile(samples, q):
+    """Return the q-th percentile (0-100) of a list of samples by nearest rank"""
+    ordered = sorted(samples)
+    if not ordered:
+        return float('nan')
+    rank = max(int(math.ceil(q / 100. * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def is_valid(grid, geometry=None):
+    """Return True if a line is a puzzle of the board, with '.' for empty boxes"""
+    board_boxes, digits = (boxes, cols) if geometry is None else (geometry.boxes, geometry.digits)
+    return len(grid) == len(board_boxes) and all(val == '.' or val in digits for val in grid)
+
+
+def run_puzzle(grid, engine, geometry=None, memory=False):
+    """Solve one puzzle and return (solved, seconds, stats, peak_bytes)"""
+    stats = SolverStats()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = solve(grid, engine, geometry=geometry, stats=stats)
+    seconds = time.perf_counter() - start
+    peak_bytes = None
+    if memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return bool(result), seconds, stats, peak_bytes
+
+
+def run_benchmark(corpora, engines, geometry=None, memory=False):
+    """Solve every puzzle of every corpus with each engine
+
+    Parameters
+    ----------
+    corpora(list)
+        paths of puzzle files with one puzzle per line
+
+    engines(list)
+        names of engines in `solution.ENGINES`
+
+    geometry(Geometry)
+        the board geometry passed to `solve` (None for the diagonal board)
+
+    memory(bool)
+        if True, measure the peak memory allocated by each solve with
+        tracemalloc (this slows the solver down, so the wall times of runs
+        with and without memory tracing are not comparable)
+
+    Yields
+    ------
+    Run
+        one record per (corpus, puzzle, engine), whose status is 'solved',
+        'unsolvable' or 'invalid' (a line that is not a puzzle of the board,
+        which is not solved and has no time or counters)
+    """
+    for corpus in corpora:
+        name = os.path.basename(corpus)
+        for index, grid in enumerate(read_grids(corpus)):
+            for engine in engines:
+                if not is_valid(grid, geometry):
+                    yield Run(name, index, engine, 'invalid', False, 0., 0, 0, 0, None)
+                    continue
+                solved, seconds, stats, peak_bytes = run_puzzle(grid, engine, geometry, memory)
+                yield Run(name, index, engine, 'solved' if solved else 'unsolvable', solved, seconds,
+                          stats.nodes, stats.backtracks, stats.propagations, peak_bytes)
+
+
+def summarize(runs):
+    """Aggregate runs by (corpus, engine)
+
+    Returns
+    -------
+    list
+        a list of dictionaries with the puzzle, solved and invalid counts, wall
+        time percentiles (over the valid puzzles) and node, backtrack and
+        propagation totals for each group
+    """
+    groups = {}
+    for run in runs:
+        groups.setdefault((run.corpus, run.engine), []).append(run)
+    summary = []
+    for (corpus, engine), group in sorted(groups.items()):
+        times = [run.seconds for run in group if run.status != 'invalid']
+        peaks = [run.peak_bytes for run in group if run.peak_bytes is not None]
+        summary.append({
+            "corpus": corpus,
+            "engine": engine,
+            "puzzles": len(group),
+            "solved": sum(run.solved for run in group),
+            "invalid": sum(run.status == 'invalid' for run in group),
+            "total_seconds": sum(times),
+            "p50_seconds": percentile(times, 50),
+            "p90_seconds": percentile(times, 90),
+            "p99_seconds": percentile(times, 99),
+            "max_seconds": percentile(times, 100),
+            "nodes": sum(run.nodes for run in group),
+            "backtracks": sum(run.backtracks for run in group),
+            "propagations": sum(run.propagations for run in group),
+            "peak_bytes": max(peaks) if peaks else None,
+        })
+    return summary
+
+
+def write_csv(path, runs):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(Run._fields)
+        writer.writerows(runs)
+
+
+def write_json(path, summary, runs):
+    with open(path, "w") as f:
+        json.dump({"summary": summary, "runs": [run._asdict() for run in runs]}, f, indent=2)
+
+
+def print_summary(summary):
+    header = "{:<20} {:<12} {:>7} {:>7} {:>7} {:>10} {:>10} {:>10} {:>10} {:>12}"
+    print(header.format("corpus", "engine", "puzzles", "solved", "invalid", "p50 (ms)",
+                        "p90 (ms)", "p99 (ms)", "max (ms)", "nodes"))
+    for row in summary:
+        print(header.format(
+            row["corpus"][:20], row["engine"], row["puzzles"], row["solved"], row["invalid"],
+            "{:.2f}".format(1000 * row["p50_seconds"]), "{:.2f}".format(1000 * row["p90_seconds"]),
+            "{:.2f}".format(1000 * row["p99_seconds"]), "{:.2f}".format(1000 * row["max_seconds"]),
+            row["nodes"]))
+
+
+def main(args):
+    geometry = Geometry(3) if args.standard else None
+    runs = list(run_benchmark(args.corpora, args.engines, geometry, args.memory))
+    summary = summarize(runs)
+    print_summary(summary)
+    if args.csv:
+        write_csv(args.csv, runs)
+    if args.json:
+        write_json(args.json, summary, runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver engines over puzzle corpora.")
+    parser.add_argument('corpora', nargs='+', help="Puzzle files with one puzzle per line.")
+    parser.add_argument(
+        '-e', '--engines', nargs='+', default=None, choices=sorted(ENGINES),
+        help="Solver engines to benchmark (default: search, or bitmask with --standard)."
+    )
+    parser.add_argument(
+        '-m', '--memory', action="store_true",
+        help="Record the peak memory allocated by each solve (slows the solver down)."
+    )
+    parser.add_argument(
+        '-s', '--standard', action="store_true",
+        help="Solve the puzzles without the diagonal units ({} engines only).".format(
+            ", ".join(GEOMETRY_ENGINES))
+    )
+    parser.add_argument('--csv', help="Write one row per puzzle and engine to this CSV file.")
+    parser.add_argument('--json', help="Write the summary and every run to this JSON file.")
+    args = parser.parse_args()
+    args.engines = args.engines or (['bitmask'] if args.standard else ['search'])
+    unsupported = sorted(set(args.engines) - set(GEOMETRY_ENGINES))
+    if args.standard and unsupported:
+        parser.error("--standard is not supported by the {} engine(s)".format(", ".join(unsupported)))
+    main(args)
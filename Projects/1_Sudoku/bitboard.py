@@ -0,0 +1,393 @@
+"""Bitmask board engine for the diagonal Sudoku solver
+
+The dictionary representation used in solution.py stores the candidates of
+each box as a string (e.g., '1379') and every strategy rebuilds those strings
+with str.replace. This module stores the same board as a flat list with one
+slot per box, where each slot is an integer whose bit k is set when digit
+k + 1 is still a candidate (e.g., '1379' <=> 0b101000101).
+
+The peer and unit tables are derived once from the `unitlist` and `peers`
+defined in solution.py, so both engines always agree on the board geometry.
+Boards of any other `Geometry` (4x4 up to 25x25) get their own tables from
+`tables_for`.
+"""
+from functools import lru_cache
+
+from utils import *
+from solution import unitlist, peers
+
+
+class _BitCount:
+    """Popcount lookup for masks too wide for a precomputed table"""
+    def __getitem__(self, mask):
+        return bin(mask).count('1')
+
+
+class BitTables:
+    """Precomputed index tables for a bitmask board
+
+    Parameters
+    ----------
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    peers(dict)
+        a dictionary with a key for each box (string) whose value is a set
+        containing all boxes that are peers of the key box
+
+    digits(string)
+        the symbols that can be placed in a box, in bit order
+    """
+    def __init__(self, boxes, unitlist, peers, digits='123456789'):
+        self.boxes = tuple(boxes)
+        self.index = {box: i for i, box in enumerate(self.boxes)}
+        self.digits = digits
+        self.full = (1 << len(digits)) - 1
+        self.bits = tuple(1 << k for k in range(len(digits)))
+        self.bit = {d: 1 << k for k, d in enumerate(digits)}
+        self.unitlist = tuple(tuple(self.index[box] for box in unit) for unit in unitlist)
+        units = [[] for _ in self.boxes]
+        for unit in self.unitlist:
+            for i in unit:
+                units[i].append(unit)
+        self.units = tuple(tuple(member_units) for member_units in units)
+        self.peers = tuple(tuple(sorted(self.index[peer] for peer in peers[box]))
+                           for box in self.boxes)
+        # popcount lookup for every possible mask (up to 16 digits)
+        if len(digits) <= 16:
+            self.count = [bin(mask).count('1') for mask in range(self.full + 1)]
+        else:
+            self.count = _BitCount()
+
+    def text(self, mask):
+        """Return the candidate string for a mask (e.g., 0b101000101 -> '1379')"""
+        return ''.join(d for d, bit in zip(self.digits, self.bits) if mask & bit)
+
+
+TABLES = BitTables(boxes, unitlist, peers)
+
+
+@lru_cache()
+def tables_for(geometry):
+    """Return the (cached) bitmask tables for a board `Geometry`"""
+    if geometry is None:
+        return TABLES
+    return BitTables(geometry.boxes, geometry.unitlist, geometry.peers, geometry.digits)
+
+
+def values2masks(values, tables=TABLES):
+    """Convert the dictionary board representation to a list of candidate masks
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    list
+        a list with one integer per box (in `boxes` order) whose set bits are
+        the candidate digits of that box
+    """
+    bit = tables.bit
+    masks = []
+    for box in tables.boxes:
+        mask = 0
+        for digit in values[box]:
+            mask |= bit[digit]
+        masks.append(mask)
+    return masks
+
+
+def masks2values(masks, tables=TABLES):
+    """Convert a list of candidate masks to the dictionary board representation
+
+    Parameters
+    ----------
+    masks(list)
+        a list with one candidate mask per box (in `boxes` order)
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    text = tables.text
+    return {box: text(mask) for box, mask in zip(tables.boxes, masks)}
+
+
+def grid2masks(grid, tables=TABLES):
+    """Convert a grid string directly into a list of candidate masks
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    Returns
+    -------
+    list
+        a list with one candidate mask per box, with all bits set for empty boxes
+    """
+    bit, full = tables.bit, tables.full
+    return [bit.get(val, full) for val in grid]
+
+
+def eliminate(masks, tables=TABLES):
+    """Remove the digit of every solved box from the candidates of its peers
+
+    Returns
+    -------
+    list
+        The same list of masks, modified in place
+    """
+    count, peers = tables.count, tables.peers
+    for i, mask in enumerate(masks):
+        if count[mask] == 1:
+            keep = ~mask
+            for peer in peers[i]:
+                masks[peer] &= keep
+    return masks
+
+
+def only_choice(masks, tables=TABLES):
+    """Assign a digit to a box when no other box in one of its units allows it
+
+    For each unit, the digits that appear in exactly one box are found with
+    two running masks (digits seen at least once, and at least twice).
+
+    Returns
+    -------
+    list or False
+        The same list of masks, modified in place, or False if some digit
+        cannot be placed anywhere in a unit
+    """
+    full = tables.full
+    for unit in tables.unitlist:
+        once = twice = 0
+        for i in unit:
+            mask = masks[i]
+            twice |= once & mask
+            once |= mask
+        if once != full:
+            return False
+        unique = once & ~twice
+        if unique:
+            for i in unit:
+                if masks[i] & unique:
+                    masks[i] &= unique
+    return masks
+
+
+def naked_twins(masks, tables=TABLES):
+    """Eliminate the digits of every pair of naked twins from the rest of their unit
+
+    All twins are located on the input board before any digit is removed, which
+    matches the convention used by `solution.naked_twins`.
+
+    Returns
+    -------
+    list
+        The same list of masks, modified in place
+    """
+    count = tables.count
+    twins = []
+    for unit in tables.unitlist:
+        seen = {}
+        for i in unit:
+            mask = masks[i]
+            if count[mask] == 2:
+                if mask in seen:
+                    twins.append((unit, seen[mask], i, mask))
+                else:
+                    seen[mask] = i
+    for unit, first, second, mask in twins:
+        keep = ~mask
+        for i in unit:
+            if i != first and i != second:
+                masks[i] &= keep
+    return masks
+
+
+def reduce_puzzle(masks, tables=TABLES):
+    """Repeatedly apply eliminate, only_choice and naked_twins until nothing changes
+
+    Returns
+    -------
+    list or False
+        The reduced list of masks, or False if some box has no candidates left
+    """
+    while True:
+        before = list(masks)
+        eliminate(masks, tables)
+        if only_choice(masks, tables) is False:
+            return False
+        naked_twins(masks, tables)
+        if 0 in masks:
+            return False
+        if masks == before:
+            return masks
+
+
+def propagate(masks, changed=None, tables=TABLES, stats=None):
+    """Reduce a board with a work queue of changed boxes
+
+    The bitmask counterpart of `solution.propagate`: only the peers and units of
+    boxes whose candidates changed are revisited, so the cost of propagation
+    grows with the number of changes rather than with the size of the board.
+
+    Parameters
+    ----------
+    masks(list)
+        a list with one candidate mask per box; it is modified in place
+
+    changed(iterable)
+        the indices of the boxes that changed since the board was last reduced;
+        defaults to every box
+
+    stats(SolverStats)
+        if given, counts the boxes taken off the work queue
+
+    Returns
+    -------
+    list or False
+        The reduced list of masks, or False if the board has no solution
+    """
+    peers, units, full = tables.peers, tables.units, tables.full
+    queue = list(range(len(masks)) if changed is None else changed)
+    queued = set(queue)
+    while queue:
+        dirty_units = set()
+        while queue:
+            i = queue.pop()
+            queued.discard(i)
+            if stats is not None:
+                stats.propagations += 1
+            mask = masks[i]
+            if not mask:
+                return False
+            if not mask & (mask - 1):
+                keep = ~mask
+                for peer in peers[i]:
+                    if masks[peer] & mask:
+                        masks[peer] &= keep
+                        if not masks[peer]:
+                            return False
+                        if peer not in queued:
+                            queued.add(peer)
+                            queue.append(peer)
+            dirty_units.update(units[i])
+        for unit in dirty_units:
+            # Only choice
+            once = twice = 0
+            for i in unit:
+                mask = masks[i]
+                twice |= once & mask
+                once |= mask
+            if once != full:
+                return False
+            unique = once & ~twice
+            if unique:
+                for i in unit:
+                    mask = masks[i]
+                    if mask & unique and mask & ~unique:
+                        mask = masks[i] = mask & unique
+                        if mask & (mask - 1):
+                            return False
+                        if i not in queued:
+                            queued.add(i)
+                            queue.append(i)
+            # Naked twins
+            seen = set()
+            for i in unit:
+                mask = masks[i]
+                rest = mask & (mask - 1)
+                if rest and not rest & (rest - 1):
+                    if mask not in seen:
+                        seen.add(mask)
+                        continue
+                    keep = ~mask
+                    for j in unit:
+                        if masks[j] != mask and masks[j] & mask:
+                            masks[j] &= keep
+                            if not masks[j]:
+                                return False
+                            if j not in queued:
+                                queued.add(j)
+                                queue.append(j)
+    return masks
+
+
+def search(masks, tables=TABLES, changed=None, stats=None):
+    """Depth first search over the box with the fewest remaining candidates
+
+    Parameters
+    ----------
+    masks(list)
+        a list with one candidate mask per box
+
+    changed(iterable)
+        the indices of the boxes that changed since the board was last reduced;
+        defaults to every box
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps
+
+    Returns
+    -------
+    list or False
+        A list of masks with every box assigned, or False if there is no solution
+    """
+    if stats is not None:
+        stats.nodes += 1
+    masks = propagate(masks, changed, tables, stats)
+    if masks is False:
+        return False
+    count = tables.count
+    unsolved = [(count[mask], i) for i, mask in enumerate(masks) if count[mask] > 1]
+    if not unsolved:
+        return masks
+    n, s = min(unsolved)
+    for bit in tables.bits:
+        if masks[s] & bit:
+            new_sudoku = list(masks)
+            new_sudoku[s] = bit
+            attempt = search(new_sudoku, tables, [s], stats)
+            if attempt:
+                return attempt
+            if stats is not None:
+                stats.backtracks += 1
+    return False
+
+
+def solve(grid, geometry=None, stats=None):
+    """Find the solution to a Sudoku puzzle using the bitmask engine
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    geometry(Geometry)
+        the board geometry; defaults to the diagonal 9x9 board of solution.py
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    tables = tables_for(geometry)
+    masks = search(grid2masks(grid, tables), tables, stats=stats)
+    if masks is False:
+        return False
+    return masks2values(masks, tables)
@@ -0,0 +1,265 @@
+"""Canonical forms of diagonal Sudoku grids and a solution cache keyed on them
+
+Two puzzles are equivalent when one can be turned into the other by a symmetry
+of the board that maps every unit of the `unitlist` onto a unit, followed by a
+relabelling of the digits. Equivalent puzzles have equivalent solutions, so a
+cache keyed on one representative of each class (the canonical form) answers
+every puzzle of that class after solving it once.
+
+The symmetries of the ordinary board (any band/stack swap, any row or column
+swap inside a band or stack, and transposition) do not all keep the two
+diagonals on the diagonals. The ones used here are those that do:
+
+- the eight rotations and reflections of the square (transposition,
+  anti-transposition, the mirror images and the rotations), which swap the
+  two diagonals or keep each in place, and
+- the permutations p of the line indices that keep bands together and commute
+  with the reflection r -> 8 - r, applied to rows and columns at the same time
+  (swapping the top and bottom bands and stacks, swapping the first and last
+  line of the middle band and stack, and any reordering of the lines of the
+  top band and stack mirrored in the bottom ones).
+
+Together they form a group of 96 board symmetries. The canonical form of a
+grid is the smallest string obtained by applying each symmetry and then
+relabelling the digits in order of first appearance.
+
+Example:
+
+    cache = SolutionCache(maxsize=10000, path='solutions.db')
+    values = solve(grid, cache=cache)
+"""
+import shelve
+
+from collections import OrderedDict
+from itertools import permutations
+from operator import itemgetter
+
+from utils import *
+
+_N = len(rows)
+
+
+def _line_permutations():
+    """Return the permutations of the line indices that keep both diagonals in place"""
+    perms = []
+    for top in permutations(range(3)):
+        for swap_bands in (False, True):
+            for swap_middle in (False, True):
+                p = [0] * _N
+                for i, j in enumerate(top):
+                    p[i], p[_N - 1 - i] = (_N - 3 + j, 2 - j) if swap_bands else (j, _N - 1 - j)
+                p[3], p[4], p[5] = (5, 4, 3) if swap_middle else (3, 4, 5)
+                perms.append(p)
+    return perms
+
+
+# the rotations and reflections of the square, as maps of (row, col) indices
+_SQUARE = (
+    lambda r, c: (r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (_N - 1 - c, _N - 1 - r),
+    lambda r, c: (r, _N - 1 - c),
+    lambda r, c: (_N - 1 - r, c),
+    lambda r, c: (c, _N - 1 - r),
+    lambda r, c: (_N - 1 - c, r),
+    lambda r, c: (_N - 1 - r, _N - 1 - c),
+)
+
+
+def _symmetries():
+    """Return every board symmetry as a tuple of source indices
+
+    Applying a symmetry `s` to a grid gives the grid whose i-th box holds the
+    value of box `s[i]` of the original.
+    """
+    found = OrderedDict()
+    for p in _line_permutations():
+        for square in _SQUARE:
+            symmetry = []
+            for r in range(_N):
+                for c in range(_N):
+                    sr, sc = square(r, c)
+                    symmetry.append(p[sr] * _N + p[sc])
+            found[tuple(symmetry)] = None
+    return list(found)
+
+
+SYMMETRIES = _symmetries()
+
+# every symmetry with getters for the first row of its image and the whole image
+_GETTERS = [(s, itemgetter(*s[:_N]), itemgetter(*s)) for s in SYMMETRIES]
+
+
+def _relabel(grid):
+    """Return the translation table that renames the digits of a grid in order
+    of first appearance, with the digits that do not appear renamed last"""
+    order = sorted(set(grid).difference('.'), key=grid.index)
+    order += [digit for digit in cols if digit not in order]
+    return str.maketrans(''.join(order), cols)
+
+
+def canonical_form(grid):
+    """Return the canonical form of a grid and the map that produces it
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid, with '.' for empty boxes
+
+    Returns
+    -------
+    (string, tuple, dict)
+        the canonical grid (a valid input for `grid2values`), the symmetry from
+        `SYMMETRIES` and the digit translation table that map the grid to it
+    """
+    # The relabelled image of the first row is the prefix of the relabelled
+    # image of the grid, so only the symmetries tied for the smallest first
+    # row can give the smallest image.
+    smallest, candidates = None, []
+    for symmetry, first_row, whole in _GETTERS:
+        prefix = ''.join(first_row(grid))
+        prefix = prefix.translate(_relabel(prefix))
+        if smallest is None or prefix < smallest:
+            smallest, candidates = prefix, [(symmetry, whole)]
+        elif prefix == smallest:
+            candidates.append((symmetry, whole))
+    best = None
+    for symmetry, whole in candidates:
+        image = ''.join(whole(grid))
+        table = _relabel(image)
+        candidate = image.translate(table)
+        if best is None or candidate < best[0]:
+            best = candidate, symmetry, table
+    return best
+
+
+def canonicalize(grid):
+    """Return the canonical form of a grid (see `canonical_form`)"""
+    return canonical_form(grid)[0]
+
+
+def to_canonical(grid, symmetry, table):
+    """Map a grid (e.g., a solution) into the frame of a canonical form"""
+    return ''.join([grid[i] for i in symmetry]).translate(table)
+
+
+def from_canonical(grid, symmetry, table):
+    """Map a grid from the frame of a canonical form back to the original frame
+
+    Inverts `to_canonical` for the symmetry and translation table returned by
+    `canonical_form`.
+    """
+    inverse = {label: digit for digit, label in table.items()}
+    image = grid.translate(inverse)
+    original = [None] * len(image)
+    for value, i in zip(image, symmetry):
+        original[i] = value
+    return ''.join(original)
+
+
+class SolutionCache:
+    """A bounded LRU cache of solutions, keyed on grids and their canonical forms
+
+    A lookup first tries the grid exactly as given, then its canonical form;
+    a solution found through the canonical form is mapped back to the frame of
+    the grid. Every solution is stored under both keys, so repeated puzzles
+    are answered without computing the canonical form again. A miss keeps the
+    canonical form it computed for the following `put` of the same grid, so
+    `solve` computes it once per new puzzle; a hit for an equivalent but not
+    identical puzzle still pays for one `canonical_form` call (about a
+    millisecond).
+
+    A puzzle with several solutions gets the solution cached for its class,
+    which is valid but may differ from the one the solver would find for that
+    exact grid.
+
+    Parameters
+    ----------
+    maxsize(int)
+        the maximum number of grids kept in memory
+
+    path(string)
+        if given, the path of a `shelve` database that also stores the solution
+        of every canonical form, so solutions survive across processes and runs
+
+    Attributes
+    ----------
+    hits(int)
+        the number of lookups answered from the cache
+
+    misses(int)
+        the number of lookups that found nothing
+    """
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._missed = None
+        self._disk = shelve.open(path) if path is not None else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, grid, solution):
+        self._entries[grid] = solution
+        self._entries.move_to_end(grid)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, grid):
+        if grid in self._entries:
+            self._entries.move_to_end(grid)
+            return self._entries[grid]
+        if self._disk is not None and grid in self._disk:
+            solution = self._disk[grid]
+            self._remember(grid, solution)
+            return solution
+        return None
+
+    def get(self, grid):
+        """Return the cached solution of a grid
+
+        Returns
+        -------
+        dict, False or None
+            the dictionary representation of the solution, False if the puzzle
+            is cached as having no solution, or None if it is not cached
+        """
+        solution = self._lookup(grid)
+        if solution is None:
+            form = canonical_form(grid)
+            canonical, symmetry, table = form
+            solution = self._lookup(canonical)
+            if solution is None:
+                self.misses += 1
+                self._missed = grid, form
+                return None
+            if solution:
+                solution = from_canonical(solution, symmetry, table)
+            self._remember(grid, solution)
+        self.hits += 1
+        return grid2values(solution) if solution else False
+
+    def put(self, grid, values):
+        """Store the solution of a grid, as returned by `solve`"""
+        solution = values2grid(values) if values else ''
+        if self._missed is not None and self._missed[0] == grid:
+            canonical, symmetry, table = self._missed[1]
+        else:
+            canonical, symmetry, table = canonical_form(grid)
+        self._missed = None
+        if solution:
+            canonical_solution = to_canonical(solution, symmetry, table)
+        else:
+            canonical_solution = ''
+        self._remember(canonical, canonical_solution)
+        self._remember(grid, solution)
+        if self._disk is not None:
+            self._disk[canonical] = canonical_solution
+
+    def close(self):
+        """Close the on-disk store, if any"""
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,184 @@
+"""Exact cover (Algorithm X) backend for the diagonal Sudoku solver
+
+A Sudoku is an exact cover problem: choose one (box, digit) placement for
+every box so that each box is filled exactly once and each digit appears
+exactly once in every unit of the `unitlist` (rows, columns, squares and, for
+the diagonal board, both diagonals). This module solves that problem with
+Knuth's Algorithm X, always branching on the constraint with the fewest
+remaining placements.
+
+Instead of the doubly linked lists of Dancing Links, the sparse cover matrix
+is stored as a dictionary from each constraint to the set of placements that
+satisfy it, plus a dictionary from each placement to the constraints it
+satisfies. Covering and uncovering a constraint are then set operations, which
+are much faster in Python than chasing linked-list nodes, while keeping the
+same predictable worst case.
+"""
+from functools import lru_cache
+
+from utils import *
+from solution import unitlist
+
+
+class CoverMatrix:
+    """The exact cover constraints of a Sudoku board
+
+    Parameters
+    ----------
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    digits(string)
+        the symbols that can be placed in a box
+    """
+    def __init__(self, boxes, unitlist, digits='123456789'):
+        self.boxes = list(boxes)
+        self.digits = digits
+        # each placement (box, digit) satisfies the "box is filled" constraint
+        # and a "digit appears in unit" constraint for every unit of the box
+        self.rows = {}
+        for box in self.boxes:
+            for digit in digits:
+                self.rows[box, digit] = [('box', box)]
+        for u, unit in enumerate(unitlist):
+            for box in unit:
+                for digit in digits:
+                    self.rows[box, digit].append(('unit', u, digit))
+        self.columns = {}
+        for row, constraints in self.rows.items():
+            for column in constraints:
+                self.columns.setdefault(column, set()).add(row)
+
+
+MATRIX = CoverMatrix(boxes, unitlist)
+
+
+@lru_cache()
+def matrix_for(geometry):
+    """Return the (cached) cover matrix for a board `Geometry`"""
+    if geometry is None:
+        return MATRIX
+    return CoverMatrix(geometry.boxes, geometry.unitlist, geometry.digits)
+
+
+def _select(X, Y, row):
+    """Cover every constraint satisfied by `row`, removing the conflicting rows"""
+    removed = []
+    for j in Y[row]:
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].remove(i)
+        removed.append(X.pop(j))
+    return removed
+
+
+def _deselect(X, Y, row, removed):
+    """Undo `_select`, restoring the constraints in reverse order"""
+    for j in reversed(Y[row]):
+        X[j] = removed.pop()
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].add(i)
+
+
+def exact_covers(X, Y, stats=None):
+    """Generate every exact cover of the remaining constraints with Algorithm X
+
+    Parameters
+    ----------
+    X(dict)
+        a dictionary from each uncovered constraint to the set of rows that
+        satisfy it; it is modified during the search and restored afterwards
+
+    Y(dict)
+        a dictionary from each row to the list of constraints it satisfies
+
+    stats(SolverStats)
+        if given, records a node for every row tried and a backtrack for every
+        row that leads to no cover
+
+    Yields
+    ------
+    list
+        the rows of each exact cover found
+    """
+    partial = []
+    # an explicit stack of (untried rows, selected row, removed columns) frames
+    # keeps the search independent of the recursion limit
+    stack = []
+    while True:
+        if not X:
+            yield list(partial)
+        else:
+            column = min(X, key=lambda c: len(X[c]))
+            stack.append([sorted(X[column]), None, None])
+        while stack:
+            frame = stack[-1]
+            if frame[1] is not None:
+                _deselect(X, Y, frame[1], frame[2])
+                partial.pop()
+                frame[1] = None
+            if not frame[0]:
+                stack.pop()
+                if stack and stats is not None:
+                    stats.backtracks += 1
+                continue
+            row = frame[0].pop(0)
+            if stats is not None:
+                stats.nodes += 1
+            frame[1], frame[2] = row, _select(X, Y, row)
+            partial.append(row)
+            break
+        else:
+            return
+
+
+def search(values, matrix=MATRIX, stats=None):
+    """Solve a puzzle in dictionary form as an exact cover problem
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}; only the
+        placements still allowed by each box are considered
+
+    Returns
+    -------
+    dict or False
+        The values dictionary with all boxes assigned or False
+    """
+    Y = matrix.rows
+    X = {column: {row for row in rows if row[1] in values[row[0]]}
+         for column, rows in matrix.columns.items()}
+    for cover in exact_covers(X, Y, stats):
+        return {box: digit for box, digit in cover}
+    return False
+
+
+def solve(grid, geometry=None, stats=None):
+    """Find the solution to a Sudoku puzzle with the exact cover backend
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    geometry(Geometry)
+        the board geometry; defaults to the diagonal 9x9 board of solution.py
+
+    stats(SolverStats)
+        if given, records the search nodes and backtracks
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    return search(grid2values(grid, geometry), matrix_for(geometry), stats)
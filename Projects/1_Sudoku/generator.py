@@ -0,0 +1,186 @@
+"""Generate new diagonal Sudoku puzzles with a unique solution
+
+Each puzzle starts from a random solved diagonal grid. Clues are then removed
+one at a time, in random order, as long as the puzzle keeps a unique solution
+(checked with `is_unique`). Difficulty is measured as the number of search
+nodes the default engine expands to solve the puzzle, and the generator keeps
+the puzzle with the fewest clues whose node count falls in the target range.
+
+Example Usage:
+
+    $ python generator.py -n 1000 -d hard -p 4 > hard.txt
+"""
+import argparse
+import random
+
+from collections import namedtuple
+from multiprocessing import Pool
+
+from solution import SolverStats, is_unique, propagate, search_trail, solve
+from utils import *
+
+# (minimum, maximum) search nodes of the default engine for each difficulty
+DIFFICULTY = {
+    'easy': (1, 1),
+    'medium': (2, 10),
+    'hard': (11, None),
+}
+
+Puzzle = namedtuple("Puzzle", "grid solution clues nodes")
+
+
+def random_solution(rng, seeds=11):
+    """Return a random solved diagonal grid as a string
+
+    A few random boxes are assigned random candidates (propagating after each
+    assignment) and the rest of the board is completed by search; boards that
+    reach a contradiction are discarded.
+
+    Parameters
+    ----------
+    rng(random.Random)
+        the random number generator
+
+    seeds(int)
+        the number of random assignments made before searching
+    """
+    while True:
+        values = grid2values('.' * len(boxes))
+        for box in rng.sample(boxes, seeds):
+            if len(values[box]) > 1:
+                values[box] = rng.choice(values[box])
+                if propagate(values, [box]) is False:
+                    break
+        else:
+            solved = search_trail(values)
+            if solved:
+                return values2grid(solved)
+
+
+def count_nodes(grid):
+    """Return the number of search nodes the default engine expands on a puzzle"""
+    stats = SolverStats()
+    solve(grid, stats=stats)
+    return stats.nodes
+
+
+def dig(grid, rng, difficulty='medium'):
+    """Remove clues from a solved grid while its solution stays unique
+
+    Parameters
+    ----------
+    grid(string)
+        a solved grid
+
+    rng(random.Random)
+        the random number generator that picks the order of removal
+
+    difficulty(string)
+        a key of `DIFFICULTY`
+
+    Returns
+    -------
+    Puzzle or None
+        the puzzle with the fewest clues whose node count is in the target
+        range, or None if no puzzle along the way was in range
+    """
+    low, high = DIFFICULTY[difficulty]
+    puzzle = list(grid)
+    best = None
+    order = list(range(len(puzzle)))
+    rng.shuffle(order)
+    for i in order:
+        digit, puzzle[i] = puzzle[i], '.'
+        candidate = ''.join(puzzle)
+        if not is_unique(candidate):
+            puzzle[i] = digit
+            continue
+        nodes = count_nodes(candidate)
+        if nodes >= low and (high is None or nodes <= high):
+            best = Puzzle(candidate, grid, len(puzzle) - candidate.count('.'), nodes)
+    return best
+
+
+def generate(seed, difficulty='medium', attempts=20):
+    """Generate one puzzle of the requested difficulty
+
+    Parameters
+    ----------
+    seed(int)
+        the seed of the random number generator, so results are reproducible
+
+    difficulty(string)
+        a key of `DIFFICULTY`
+
+    attempts(int)
+        the number of solved grids to dig before giving up
+
+    Returns
+    -------
+    Puzzle or None
+        the generated puzzle, or None if every attempt missed the target difficulty
+    """
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        puzzle = dig(random_solution(rng), rng, difficulty)
+        if puzzle is not None:
+            return puzzle
+    return None
+
+
+def _generate(args):
+    return generate(*args)
+
+
+def generate_many(count, difficulty='medium', workers=None, seed=None, attempts=20):
+    """Generate puzzles across a pool of worker processes
+
+    Parameters
+    ----------
+    count(int)
+        the number of puzzles to try to generate
+
+    difficulty(string)
+        a key of `DIFFICULTY`
+
+    workers(int)
+        the number of worker processes; None uses every available core, and 1
+        generates the puzzles in the current process
+
+    seed(int)
+        the seed used to derive one seed per puzzle
+
+    Yields
+    ------
+    Puzzle
+        each generated puzzle, in completion order (puzzles that miss the
+        target difficulty after every attempt are skipped)
+    """
+    rng = random.Random(seed)
+    tasks = ((rng.getrandbits(32), difficulty, attempts) for _ in range(count))
+    if workers == 1:
+        results = map(_generate, tasks)
+        yield from (puzzle for puzzle in results if puzzle is not None)
+        return
+    with Pool(workers) as pool:
+        for puzzle in pool.imap_unordered(_generate, tasks):
+            if puzzle is not None:
+                yield puzzle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate diagonal Sudoku puzzles with a unique solution.")
+    parser.add_argument('-n', '--count', type=int, default=10, help="Number of puzzles to generate.")
+    parser.add_argument(
+        '-d', '--difficulty', default='medium', choices=sorted(DIFFICULTY),
+        help="Target difficulty, measured in search nodes (default: medium)."
+    )
+    parser.add_argument(
+        '-p', '--processes', type=int, default=None,
+        help="Number of worker processes (default: one per core)."
+    )
+    parser.add_argument('-s', '--seed', type=int, default=None, help="Random seed.")
+    args = parser.parse_args()
+
+    for puzzle in generate_many(args.count, args.difficulty, args.processes, args.seed):
+        print(puzzle.grid)
@@ -0,0 +1,154 @@
+"""Packed binary archives of 9x9 Sudoku puzzles with memory-mapped access
+
+An archive is an 8-byte header followed by fixed-size 42-byte records, so the
+i-th puzzle starts at byte 8 + 42 * i and can be read without parsing the
+rest of the file. Each record is one flag byte (bit 0 set when the grid is a
+solved board) followed by the 81 boxes packed two per byte, 4 bits per box,
+with 0 for an empty box and 1-9 for a digit.
+
+Because the digits are 1-9 and empty boxes are 0, a grid packs to the bytes
+whose hexadecimal spelling is the grid itself with '.' replaced by '0', so
+`bytes.fromhex` and `bytes.hex` do the packing in C.
+
+Example:
+
+    write_puzzles('top95.sdk', read_grids('top95.txt'))
+    with PuzzleArchive('top95.sdk') as archive:
+        grid, solved = archive[42]
+"""
+import mmap
+
+from collections import namedtuple
+
+from utils import *
+
+MAGIC = b'SDKP\x01\x00\x00\x00'
+HEADER_SIZE = len(MAGIC)
+RECORD_SIZE = 1 + (len(boxes) + 1) // 2
+SOLVED = 0x01
+
+Record = namedtuple("Record", "grid solved")
+
+
+def pack(grid, solved=False):
+    """Pack a 9x9 grid string and its solved flag into one record
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid, with '.' for empty boxes
+
+    solved(bool)
+        whether the grid is a solved board
+
+    Returns
+    -------
+    bytes
+        a RECORD_SIZE byte record
+    """
+    if len(grid) != len(boxes) or not set(grid) <= set(cols + '.'):
+        raise ValueError("Not a 9x9 grid: {!r}".format(grid))
+    return bytes([SOLVED if solved else 0]) + bytes.fromhex(grid.replace('.', '0') + '0')
+
+
+def unpack(record):
+    """Unpack one record into a (grid, solved) tuple"""
+    return Record(record[1:].hex()[:len(boxes)].replace('0', '.'), bool(record[0] & SOLVED))
+
+
+def write_puzzles(path, grids, solved=False):
+    """Write an archive from a stream of grids, one record at a time
+
+    Parameters
+    ----------
+    path(string)
+        the path of the archive to create
+
+    grids(iterable)
+        the grid strings to store
+
+    solved(bool)
+        the solved flag written with every grid
+
+    Returns
+    -------
+    int
+        the number of records written
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for grid in grids:
+            f.write(pack(grid, solved))
+            count += 1
+    return count
+
+
+class PuzzleArchive:
+    """Random access to the records of an archive through a memory map
+
+    Parameters
+    ----------
+    path(string)
+        the path of the archive
+
+    writable(bool)
+        if True, records can be replaced in place (e.g., to store the
+        solution of a puzzle and set its solved flag)
+    """
+    def __init__(self, path, writable=False):
+        self._file = open(path, 'r+b' if writable else 'rb')
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+        if self._map[:HEADER_SIZE] != MAGIC:
+            self.close()
+            raise ValueError("Not a packed puzzle archive: {}".format(path))
+
+    @classmethod
+    def create(cls, path, count):
+        """Create an archive of `count` empty records and open it for writing"""
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.truncate(HEADER_SIZE + count * RECORD_SIZE)
+        return cls(path, writable=True)
+
+    def __len__(self):
+        return (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+
+    def _offset(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Record index out of range")
+        return HEADER_SIZE + i * RECORD_SIZE
+
+    def __getitem__(self, i):
+        offset = self._offset(i)
+        return unpack(self._map[offset:offset + RECORD_SIZE])
+
+    def __setitem__(self, i, record):
+        grid, solved = record
+        offset = self._offset(i)
+        self._map[offset:offset + RECORD_SIZE] = pack(grid, solved)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def grids(self):
+        """Yield the grid string of every record, e.g., as input for `solve_many`"""
+        for grid, solved in self:
+            yield grid
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,4 +1,12 @@
 
+import os
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from functools import partial
+from itertools import combinations, islice
+from multiprocessing import Pool
+
 from utils import *
 
 
@@ -13,9 +21,17 @@ rev_diag_units= [[r+c for r,c in zip(rows, cols[-1::-1])]]
 unitlist = unitlist + diag_units + rev_diag_units
 
 
-# Must be called after all units (including diagonals) are added to the unitlist
-units = extract_units(unitlist, boxes)
-peers = extract_peers(units, boxes)
+# The units and peers of the diagonal board (the units of the unitlist above),
+# taken from the tables that are built once per process and shared with every
+# geometry and engine (see `unit_tables`)
+units = unit_tables(3, diagonal=True).units
+peers = unit_tables(3, diagonal=True).peers
+
+# Rows, columns and diagonals, which intersect the squares in pointing pairs
+line_units = row_units + column_units + diag_units + rev_diag_units
+
+# Boxes that are peers of both boxes in a pair, for every pair of peer boxes
+shared_peers = {(boxA, boxB): peers[boxA] & peers[boxB] for boxA in boxes for boxB in peers[boxA]}
 
 
 def naked_twins(values):
@@ -55,18 +71,23 @@ def naked_twins(values):
     Pseudocode for this algorithm on github:
     https://github.com/udacity/artificial-intelligence/blob/master/Projects/1_Sudoku/pseudocode.md
     """
-    # TODO: Implement this function!
-    out= values.copy()
-    for boxA,valueA in values.items():
-        for boxB in peers[boxA]:
-            valueB= values[boxB]
-            if (len(valueA) == 2) and (len(valueB) == 2) and (valueA == valueB):
-                for peer in peers[boxA]&peers[boxB]:
-                    for digit in valueA:
-                        out[peer]= out[peer].replace(digit,'')
+    # Index the two-candidate boxes of each unit by their candidate pair, so
+    # every pair of naked twins is found in a single pass over the unit
+    twins = set()
+    for unit in unitlist:
+        pairs = {}
+        for box in unit:
+            if len(values[box]) == 2:
+                pairs.setdefault(values[box], []).append(box)
+        for pair_boxes in pairs.values():
+            twins.update(combinations(pair_boxes, 2))
+    out = values.copy()
+    for boxA, boxB in twins:
+        for peer in shared_peers[boxA, boxB]:
+            for digit in values[boxA]:
+                out[peer] = out[peer].replace(digit, '')
     return out
-                
-            
+
 
 def eliminate(values):
     """Apply the eliminate strategy to a Sudoku puzzle
@@ -116,11 +137,271 @@ def only_choice(values):
         for digit in '123456789':
             dplaces = [box for box in unit if digit in values[box]]
             if len(dplaces) == 1:
-                values[dplaces[0]] = digit
+                assign_value(values, dplaces[0], digit)
+    return values
+
+
+def hidden_subsets(values, n):
+    """Apply the hidden subsets strategy to a Sudoku puzzle
+
+    The hidden subsets strategy says that if n digits can only go in the same n
+    boxes of a unit, then those boxes cannot hold any other digit.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    n(int)
+        the size of the subsets to look for (2 for pairs, 3 for triples)
+
+    Returns
+    -------
+    dict
+        The values dictionary with the other digits removed from hidden subsets
+    """
+    for unit in unitlist:
+        places = {digit: {box for box in unit if digit in values[box]} for digit in '123456789'}
+        candidates = [digit for digit in '123456789' if 2 <= len(places[digit]) <= n]
+        for digits in combinations(candidates, n):
+            subset = set().union(*(places[digit] for digit in digits))
+            if len(subset) == n:
+                for box in subset:
+                    values[box] = ''.join(digit for digit in values[box] if digit in digits)
+    return values
+
+
+def hidden_pairs(values):
+    """Apply the hidden subsets strategy for pairs of digits (see `hidden_subsets`)"""
+    return hidden_subsets(values, 2)
+
+
+def hidden_triples(values):
+    """Apply the hidden subsets strategy for triples of digits (see `hidden_subsets`)"""
+    return hidden_subsets(values, 3)
+
+
+def _intersection_removal(values, sources, targets):
+    """Remove a digit from a target unit when every place for that digit in a
+    source unit lies in the intersection of the two units
+    """
+    target_sets = [(target, set(target)) for target in targets]
+    for source in sources:
+        for digit in '123456789':
+            places = {box for box in source if digit in values[box]}
+            if not places:
+                continue
+            for target, target_set in target_sets:
+                if places <= target_set:
+                    for box in target:
+                        if box not in places:
+                            values[box] = values[box].replace(digit, '')
+    return values
+
+
+def pointing_pairs(values):
+    """Apply the pointing pairs strategy to a Sudoku puzzle
+
+    The pointing pairs strategy says that if every box of a square that allows
+    a digit lies on the same row, column or diagonal, then that digit can be
+    eliminated from the rest of that line.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the pointed digits eliminated from the lines
+    """
+    return _intersection_removal(values, square_units, line_units)
+
+
+def box_line_reduction(values):
+    """Apply the box/line reduction strategy to a Sudoku puzzle
+
+    The box/line reduction strategy says that if every box of a row, column or
+    diagonal that allows a digit lies in the same square, then that digit can
+    be eliminated from the rest of that square.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the digits eliminated from the squares
+    """
+    return _intersection_removal(values, line_units, square_units)
+
+
+def x_wing(values):
+    """Apply the X-Wing strategy to a Sudoku puzzle
+
+    The X-Wing strategy says that if a digit can only go in the same two
+    columns of two different rows, then it must occupy those columns in those
+    rows, and it can be eliminated from the rest of both columns (and likewise
+    with rows and columns swapped).
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the X-Wing digits eliminated
+    """
+    for digit in '123456789':
+        # the box at position j of line i is at position i of cross line j
+        for lines, crosses in ((row_units, column_units), (column_units, row_units)):
+            wings = {}
+            for i, line in enumerate(lines):
+                positions = tuple(j for j, box in enumerate(line) if digit in values[box])
+                if len(positions) == 2:
+                    wings.setdefault(positions, []).append(i)
+            for positions, found in wings.items():
+                if len(found) < 2:
+                    continue
+                for j in positions:
+                    for i, box in enumerate(crosses[j]):
+                        if i not in found:
+                            values[box] = values[box].replace(digit, '')
     return values
 
 
-def reduce_puzzle(values):
+STRATEGIES = {
+    'eliminate': eliminate,
+    'only_choice': only_choice,
+    'naked_twins': naked_twins,
+    'hidden_pairs': hidden_pairs,
+    'hidden_triples': hidden_triples,
+    'pointing_pairs': pointing_pairs,
+    'box_line_reduction': box_line_reduction,
+    'x_wing': x_wing,
+}
+
+DEFAULT_STRATEGIES = ('eliminate', 'only_choice', 'naked_twins')
+
+
+class SolverStats:
+    """Counters collected while solving a puzzle
+
+    Attributes
+    ----------
+    nodes(int)
+        the number of search nodes (boards reduced by constraint propagation)
+
+    backtracks(int)
+        the number of branches that led to a contradiction
+
+    propagations(int)
+        the number of propagation steps: full-board sweeps in `reduce_puzzle`,
+        or boxes taken off the work queue in `propagate`
+
+    calls(Counter)
+        the number of times each strategy was applied
+
+    eliminations(Counter)
+        the number of candidate digits each strategy removed
+
+    seconds(Counter)
+        the total time spent in each strategy
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.calls = Counter()
+        self.eliminations = Counter()
+        self.seconds = Counter()
+
+    def record(self, name, eliminations, seconds):
+        self.calls[name] += 1
+        self.eliminations[name] += eliminations
+        self.seconds[name] += seconds
+
+    def update(self, other):
+        """Add the counters of another SolverStats to this one"""
+        self.nodes += other.nodes
+        self.backtracks += other.backtracks
+        self.propagations += other.propagations
+        self.calls.update(other.calls)
+        self.eliminations.update(other.eliminations)
+        self.seconds.update(other.seconds)
+
+
+class SearchTimeout(Exception):
+    """Raised by `solve` when a search runs out of its node or time budget
+
+    Attributes
+    ----------
+    reason(string)
+        'nodes' or 'seconds', the budget that ran out
+
+    stats(SolverStats)
+        the counters collected until the search was stopped
+
+    seconds(float)
+        the time spent searching
+    """
+    def __init__(self, reason, stats, seconds):
+        super().__init__("Search stopped after {} nodes and {:.3f} seconds: {} budget exhausted".format(
+            stats.nodes, seconds, reason))
+        self.reason = reason
+        self.stats = stats
+        self.seconds = seconds
+
+
+class Budget(SolverStats):
+    """SolverStats that stop the search once a node or wall-clock budget runs out
+
+    Every engine counts a node on `stats.nodes` before expanding it, so the
+    budget is checked there and `SearchTimeout` is raised from inside the
+    search, whichever engine is running.
+
+    Parameters
+    ----------
+    max_nodes(int)
+        the maximum number of search nodes (None means no limit)
+
+    max_seconds(float)
+        the maximum wall-clock time in seconds, counted from the creation of
+        the budget (None means no limit)
+    """
+    def __init__(self, max_nodes=None, max_seconds=None):
+        # the counters are set up before the limits, so that only counting a
+        # node during the search can stop it
+        self._nodes = 0
+        super().__init__()
+        self.max_nodes = max_nodes
+        self.start = time.perf_counter()
+        self.deadline = None if max_seconds is None else self.start + max_seconds
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes):
+        counted = nodes > self._nodes
+        self._nodes = nodes
+        if not counted:
+            return
+        if self.max_nodes is not None and nodes > self.max_nodes:
+            raise SearchTimeout('nodes', self, time.perf_counter() - self.start)
+        if self.deadline is not None:
+            now = time.perf_counter()
+            if now > self.deadline:
+                raise SearchTimeout('seconds', self, now - self.start)
+
+
+def reduce_puzzle(values, incremental=False, strategies=None, stats=None):
     """Reduce a Sudoku puzzle by repeatedly applying all constraint strategies
 
     Parameters
@@ -128,32 +409,149 @@ def reduce_puzzle(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    incremental(bool)
+        if True, reduce the puzzle with the work queue in `propagate` instead
+        of sweeping every strategy over the whole board
+
+    strategies(sequence)
+        the names of the strategies in `STRATEGIES` to apply, in order; defaults
+        to `DEFAULT_STRATEGIES`; incremental mode always applies the strategies
+        of `propagate`, so it raises ValueError if any are given
+
+    stats(SolverStats)
+        if given, records the sweeps, and the eliminations made and the time
+        spent by each strategy (in incremental mode, the boxes taken off the
+        work queue as in `propagate`)
+
     Returns
     -------
     dict or False
         The values dictionary after continued application of the constraint strategies
         no longer produces any changes, or False if the puzzle is unsolvable 
     """
+    if incremental:
+        if strategies is not None:
+            raise ValueError("Strategies cannot be chosen in incremental mode")
+        return propagate(values, stats=stats)
+    if strategies is None:
+        strategies = DEFAULT_STRATEGIES
     stalled = False
+    # Check how many candidates remain
+    candidates = sum(len(v) for v in values.values())
     while not stalled:
-        # Check how many boxes have a determined value
-        solved_values_before = len([box for box in values.keys() if len(values[box]) == 1])
-        # Use the Eliminate Strategy
-        values = eliminate(values)
-        # Use the Only Choice Strategy
-        values = only_choice(values)
-        values= naked_twins(values)
-        # Check how many boxes have a determined value, to compare
-        solved_values_after = len([box for box in values.keys() if len(values[box]) == 1])
-        # If no new values were added, stop the loop.
-        stalled = solved_values_before == solved_values_after
+        if stats is not None:
+            stats.propagations += 1
+        candidates_before = candidates
+        for name in strategies:
+            if stats is None:
+                values = STRATEGIES[name](values)
+                continue
+            start = time.perf_counter()
+            values = STRATEGIES[name](values)
+            elapsed = time.perf_counter() - start
+            remaining = sum(len(v) for v in values.values())
+            stats.record(name, candidates - remaining, elapsed)
+            candidates = remaining
+        # Check how many candidates remain, to compare
+        candidates = sum(len(v) for v in values.values())
+        # If no candidates were removed, stop the loop.
+        stalled = candidates_before == candidates
         # Sanity check, return False if there is a box with zero available values:
-        if len([box for box in values.keys() if len(values[box]) == 0]):
+        if '' in values.values():
             return False
     return values
 
 
-def search(values):
+def propagate(values, changed=None, trail=None, stats=None):
+    """Reduce a Sudoku puzzle with a work queue of changed boxes
+
+    Applies the same eliminate, only choice and naked twins strategies as
+    `reduce_puzzle`, but only to the neighborhood of boxes whose candidates
+    changed: a solved box is eliminated from its peers, and every unit that
+    contains a changed box is re-checked for only choices and naked twins.
+    Propagation stops as soon as a box runs out of candidates or a digit has
+    no place left in a unit.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}; it is modified in place
+
+    changed(iterable)
+        the boxes whose candidates changed since the puzzle was last reduced;
+        defaults to every box on the board
+
+    trail(list)
+        if given, a (box, previous value) entry is appended for every change
+        so that `undo` can restore the board
+
+    stats(SolverStats)
+        if given, counts the boxes taken off the work queue
+
+    Returns
+    -------
+    dict or False
+        The reduced values dictionary, or False if the puzzle is unsolvable
+    """
+    queue = deque(boxes if changed is None else changed)
+    queued = set(queue)
+    dirty_units = []
+
+    def remove(box, digits):
+        value = values[box]
+        new_value = ''.join(d for d in value if d not in digits)
+        if new_value == value:
+            return True
+        if trail is not None:
+            trail.append((box, value))
+        values[box] = new_value
+        if box not in queued:
+            queued.add(box)
+            queue.append(box)
+        return len(new_value) > 0
+
+    while queue or dirty_units:
+        while queue:
+            box = queue.popleft()
+            queued.discard(box)
+            if stats is not None:
+                stats.propagations += 1
+            value = values[box]
+            if not value:
+                return False
+            if len(value) == 1:
+                for peer in peers[box]:
+                    if not remove(peer, value):
+                        return False
+            dirty_units.extend(units[box])
+        seen = set()
+        while dirty_units:
+            unit = dirty_units.pop()
+            if id(unit) in seen:
+                continue
+            seen.add(id(unit))
+            # Only choice
+            for digit in '123456789':
+                dplaces = [box for box in unit if digit in values[box]]
+                if not dplaces:
+                    return False
+                if len(dplaces) == 1 and len(values[dplaces[0]]) > 1:
+                    if not remove(dplaces[0], values[dplaces[0]].replace(digit, '')):
+                        return False
+            # Naked twins
+            pairs = {}
+            for box in unit:
+                if len(values[box]) == 2:
+                    pairs.setdefault(values[box], []).append(box)
+            for pair, twins in pairs.items():
+                if len(twins) > 1:
+                    for box in unit:
+                        if box not in twins and not remove(box, pair):
+                            return False
+    return values
+
+
+def search(values, incremental=False, changed=None, strategies=None, stats=None):
     """Apply depth first search to solve Sudoku puzzles in order to solve puzzles
     that cannot be solved by repeated reduction alone.
 
@@ -162,6 +560,20 @@ def search(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    incremental(bool)
+        if True, reduce each node with the work queue in `propagate`
+
+    changed(iterable)
+        in incremental mode, the boxes that changed since `values` was last
+        reduced (defaults to every box)
+
+    strategies(sequence)
+        the names of the strategies applied by `reduce_puzzle` at every node
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps,
+        and the eliminations made and time spent by each strategy
+
     Returns
     -------
     dict or False
@@ -172,7 +584,12 @@ def search(values):
     You should be able to complete this function by copying your code from the classroom
     and extending it to call the naked twins strategy.
     """
-    values = reduce_puzzle(values)
+    if stats is not None:
+        stats.nodes += 1
+    if incremental:
+        values = propagate(values, changed, stats=stats)
+    else:
+        values = reduce_puzzle(values, strategies=strategies, stats=stats)
     if values is False:
         return False ## Failed earlier
     if all(len(values[s]) == 1 for s in boxes): 
@@ -182,12 +599,180 @@ def search(values):
     # Now use recurrence to solve each one of the resulting sudokus, and 
     for value in values[s]:
         new_sudoku = values.copy()
-        new_sudoku[s] = value
-        attempt = search(new_sudoku)
+        mark = checkpoint()
+        assign_value(new_sudoku, s, value)
+        attempt = search(new_sudoku, incremental, [s], strategies, stats)
         if attempt:
             return attempt
+        rollback(mark)
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+def undo(values, trail, mark):
+    """Roll back the changes recorded on a trail until it is `mark` entries long
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}; it is modified in place
+
+    trail(list)
+        a list of (box, previous value) entries in the order the changes were made
+
+    mark(int)
+        the length of the trail at the point to restore
+    """
+    while len(trail) > mark:
+        box, value = trail.pop()
+        values[box] = value
+
+
+def iter_solutions(values, stats=None):
+    """Generate every solution of a puzzle with iterative trail-based search
+
+    Instead of copying the board at every branch, each candidate digit is tried
+    in place and the changes made by `propagate` are recorded on a trail; on
+    backtrack they are rolled back with `undo`. The propagation done at a
+    branch point is therefore shared by all of its subtrees. An explicit stack
+    of branch points replaces recursion, so the search depth is not bounded by
+    Python's recursion limit.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}; it is modified in place
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps
+
+    Yields
+    ------
+    dict
+        the values dictionary itself each time every box is assigned (copy it
+        to keep a solution once the generator is resumed)
+    """
+    trail = []
+    if stats is not None:
+        stats.nodes += 1
+    if propagate(values, None, trail, stats) is False:
+        return
+    stack = []  # (box, iterator over untried digits, trail length) for each branch point
+    while True:
+        unsolved = [(len(value), box) for box, value in values.items() if len(value) > 1]
+        if not unsolved:
+            yield values
+        else:
+            n, s = min(unsolved)
+            stack.append((s, iter(values[s]), len(trail)))
+        while stack:
+            box, digits, mark = stack[-1]
+            undo(values, trail, mark)
+            digit = next(digits, None)
+            if digit is None:
+                stack.pop()
+                continue
+            trail.append((box, values[box]))
+            values[box] = digit
+            if stats is not None:
+                stats.nodes += 1
+            if propagate(values, [box], trail, stats):
+                break
+            if stats is not None:
+                stats.backtracks += 1
+        else:
+            return
+
+
+def search_trail(values, stats=None):
+    """Apply iterative depth first search on a single board with an undo trail
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}; it is modified in place
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps
+
+    Returns
+    -------
+    dict or False
+        The values dictionary with all boxes assigned or False
+
+    See Also
+    --------
+    iter_solutions
+    """
+    for solved in iter_solutions(values, stats):
+        return solved
+    return False
+
+
+def count_solutions(grid, limit=None, stats=None):
+    """Count the solutions of a Sudoku puzzle
 
-def solve(grid):
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    limit(int)
+        stop searching as soon as this many solutions are found (None counts
+        every solution, and a limit of 0 or less returns 0 without searching)
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps
+
+    Returns
+    -------
+    int
+        the number of solutions, at most `limit`
+    """
+    count = 0
+    if limit is not None and limit <= 0:
+        return count
+    for _ in iter_solutions(grid2values(grid), stats):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def is_unique(grid, stats=None):
+    """Return True if a Sudoku puzzle has exactly one solution
+
+    The search stops as soon as a second solution is found.
+    """
+    return count_solutions(grid, limit=2, stats=stats) == 1
+
+
+def _search_bitmask(values, stats=None):
+    import bitboard
+    masks = bitboard.search(bitboard.values2masks(values), stats=stats)
+    return masks and bitboard.masks2values(masks)
+
+
+def _search_dlx(values, stats=None):
+    import dlx
+    return dlx.search(values, stats=stats)
+
+
+ENGINES = {
+    'search': search,
+    'incremental': partial(search, incremental=True),
+    'trail': search_trail,
+    'bitmask': _search_bitmask,
+    'dlx': _search_dlx,
+}
+
+# the engines that `solve` can run on a Geometry other than the diagonal board
+GEOMETRY_ENGINES = ('bitmask', 'dlx')
+
+
+def solve(grid, engine=None, geometry=None, strategies=None, stats=None, history=None, cache=None,
+          max_nodes=None, max_seconds=None):
     """Find the solution to a Sudoku puzzle using search and constraint propagation
 
     Parameters
@@ -197,16 +782,290 @@ def solve(grid):
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
 
+    engine(string)
+        the name of the search engine in `ENGINES` to use: 'search' (recursive
+        search with full-board sweeps), 'incremental' (recursive search with
+        work queue propagation), 'trail' (iterative search with an undo trail),
+        'bitmask' (the bitmask board in bitboard.py) or 'dlx' (the exact cover
+        backend in dlx.py); defaults to 'search' on the diagonal board and to
+        'bitmask' for other geometries
+
+    geometry(Geometry)
+        the board geometry for boards other than the diagonal 9x9 board defined
+        in this module (e.g., `Geometry(4)` for 16x16 puzzles); only the
+        engines in `GEOMETRY_ENGINES` support other geometries
+
+    strategies(sequence)
+        the names of the strategies in `STRATEGIES` to apply at every node of
+        the 'search' engine; defaults to `DEFAULT_STRATEGIES`
+
+    stats(SolverStats)
+        if given, records the search nodes, backtracks and propagation steps,
+        and for the 'search' engine, the eliminations made and time spent by
+        each strategy
+
+    history(History)
+        if given, records the assignments made by the 'search' engine during
+        this solve (see `utils.History` for the recording modes)
+
+    cache(SolutionCache)
+        if given, the cache in canonical.py is checked before solving and
+        updated afterwards; puzzles answered from the cache record no stats or
+        history
+
+    max_nodes(int)
+        if given, the search is stopped with `SearchTimeout` after expanding
+        this many nodes
+
+    max_seconds(float)
+        if given, the search is stopped with `SearchTimeout` after this many
+        seconds of wall-clock time
+
     Returns
     -------
     dict or False
         The dictionary representation of the final sudoku grid or False if no solution exists.
     """
+    if max_nodes is not None or max_seconds is not None:
+        budget = None
+        try:
+            budget = Budget(max_nodes, max_seconds)
+            return solve(grid, engine, geometry, strategies, budget, history, cache)
+        finally:
+            if stats is not None and budget is not None:
+                stats.update(budget)
+    if cache is not None:
+        if geometry is not None:
+            raise ValueError("The solution cache only supports the diagonal board")
+        values = cache.get(grid)
+        if values is None:
+            values = solve(grid, engine, strategies=strategies, stats=stats, history=history)
+            cache.put(grid, values)
+        return values
+    if geometry is not None:
+        if engine is None:
+            engine = 'bitmask'
+        if engine not in GEOMETRY_ENGINES:
+            raise ValueError("The {} engine only supports the diagonal board".format(engine))
+        if engine == 'dlx':
+            import dlx
+            return dlx.solve(grid, geometry, stats)
+        import bitboard
+        return bitboard.solve(grid, geometry, stats)
     values = grid2values(grid)
-    values = search(values)
+    if engine is None or engine == 'search':
+        with recording(history):
+            return search(values, strategies=strategies, stats=stats)
+    if strategies is not None or history is not None:
+        raise ValueError("Strategies and history are only supported by the search engine")
+    values = ENGINES[engine](values, stats=stats)
     return values
 
 
+SolveResult = namedtuple("SolveResult", "grid values seconds")
+
+
+def _timed_solve(grid):
+    start = time.perf_counter()
+    values = solve(grid)
+    return SolveResult(grid, values, time.perf_counter() - start)
+
+
+def read_grids(source):
+    """Stream puzzle strings from a file path or an iterable of lines
+
+    Parameters
+    ----------
+    source(string or iterable)
+        the path of a file with one puzzle per line, or any iterable of puzzle
+        strings (including an open file object). Surrounding whitespace is
+        stripped and blank lines are skipped.
+
+    Yields
+    ------
+    string
+        one 81-character puzzle string at a time
+    """
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from read_grids(f)
+        return
+    for line in source:
+        grid = line.strip()
+        if grid:
+            yield grid
+
+
+def imap_chunks(pool, function, items, chunksize, window):
+    """Apply a function to chunks of a stream in a pool, reading the stream lazily
+
+    The pool reads the stream from its task thread, so a result is passed on
+    as soon as it is ready even while reading the next item blocks. Each chunk
+    takes one of `window` slots, which is given back once its result has been
+    consumed, so memory stays bounded however long the stream is.
+
+    Parameters
+    ----------
+    pool(multiprocessing.Pool)
+        the pool that applies the function
+
+    function(callable)
+        a picklable function of a list of items
+
+    items(iterable)
+        the stream of items
+
+    chunksize(int)
+        the number of items in each chunk
+
+    window(int)
+        the maximum number of chunks submitted and not yet consumed
+
+    Yields
+    ------
+    object
+        the return value of `function` for each chunk, in input order
+    """
+    items = iter(items)
+    slots = threading.Semaphore(window)
+    stopped = threading.Event()
+
+    def tasks():
+        while True:
+            while not slots.acquire(timeout=0.1):
+                if stopped.is_set():
+                    return
+            chunk = list(islice(items, chunksize))
+            if not chunk or stopped.is_set():
+                return
+            yield chunk
+
+    try:
+        for result in pool.imap(function, tasks()):
+            slots.release()
+            yield result
+    finally:
+        stopped.set()
+
+
+def _timed_solve_chunk(grids):
+    return [_timed_solve(grid) for grid in grids]
+
+
+def solve_many(grids, workers=None, chunksize=64, window=None):
+    """Solve a stream of Sudoku puzzles across a pool of worker processes
+
+    Parameters
+    ----------
+    grids(string or iterable)
+        the path of a file with one puzzle per line, or an iterable of puzzle strings
+
+    workers(int)
+        the number of worker processes; None uses every available core, and 1
+        solves the puzzles in the current process without starting a pool
+
+    chunksize(int)
+        the number of puzzles sent to a worker at a time
+
+    window(int)
+        the maximum number of chunks read and not yet yielded (see
+        `imap_chunks`); defaults to twice the number of workers
+
+    Yields
+    ------
+    SolveResult
+        a (grid, values, seconds) tuple for each puzzle, in input order, where
+        values is the return value of `solve` and seconds is the time spent
+        solving that puzzle inside the worker
+    """
+    grids = read_grids(grids)
+    if workers == 1:
+        yield from map(_timed_solve, grids)
+        return
+    window = window or 2 * (workers or os.cpu_count())
+    with Pool(workers) as pool:
+        for results in imap_chunks(pool, _timed_solve_chunk, grids, chunksize, window):
+            yield from results
+
+
+def split(values, depth, changed=None):
+    """Expand the top of the search tree into independent subproblems
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    depth(int)
+        the number of branch points to expand; each one branches on the box
+        with the fewest remaining candidates, as `search` does
+
+    changed(iterable)
+        the boxes whose candidates changed since the puzzle was last reduced;
+        defaults to every box on the board
+
+    Yields
+    ------
+    dict
+        the reduced board of each branch that propagation does not rule out,
+        in the order `search` would visit them
+    """
+    values = propagate(dict(values), changed)
+    if values is False:
+        return
+    unsolved = [(len(values[box]), box) for box in boxes if len(values[box]) > 1]
+    if depth == 0 or not unsolved:
+        yield values
+        return
+    n, s = min(unsolved)
+    for digit in values[s]:
+        branch = dict(values)
+        branch[s] = digit
+        yield from split(branch, depth - 1, [s])
+
+
+def _search_subproblem(args):
+    values, engine = args
+    return ENGINES[engine](values)
+
+
+def solve_parallel(grid, depth=2, workers=None, engine='bitmask'):
+    """Find the solution to a single hard puzzle across a pool of worker processes
+
+    The search tree is expanded to `depth` branch points with `split`, and the
+    resulting subproblems are searched in parallel. As soon as one of them
+    returns a solution, the pool is terminated, cancelling the rest.
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid
+
+    depth(int)
+        the number of branch points expanded before handing out subproblems
+
+    workers(int)
+        the number of worker processes; None uses every available core, and 1
+        searches the subproblems in order in the current process
+
+    engine(string)
+        the name of the engine in `ENGINES` used to search each subproblem
+
+    Returns
+    -------
+    dict or False
+        The dictionary representation of the final sudoku grid or False if no solution exists.
+    """
+    tasks = ((values, engine) for values in split(grid2values(grid), depth))
+    if workers == 1:
+        results = map(_search_subproblem, tasks)
+        return next((values for values in results if values), False)
+    with Pool(workers) as pool:
+        for values in pool.imap_unordered(_search_subproblem, tasks):
+            if values:
+                return values
+    return False
+
 if __name__ == "__main__":
     # original one
     #diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
@@ -215,7 +1074,8 @@ if __name__ == "__main__":
     diag_sudoku_grid= "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."
     
     display(grid2values(diag_sudoku_grid))
-    result = solve(diag_sudoku_grid)
+    history = History('full')
+    result = solve(diag_sudoku_grid, history=history)
     display(result)
     
 
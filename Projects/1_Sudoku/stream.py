@@ -0,0 +1,159 @@
+"""Solve a stream of diagonal Sudoku puzzles with line-delimited input and output
+
+Puzzles are read one per line from a file or stdin as they arrive, and one
+line is written per puzzle, in input order: the solved grid, or 'unsolvable',
+'timeout' or 'invalid'. Only a bounded window of chunks is in flight at any
+time, so memory stays constant however long the input is, and each result is
+written and flushed as soon as it and every earlier result are done, so the
+command can sit in a Unix pipeline. Lines read from stdin are sent to the
+workers one at a time by default, so a puzzle never waits for a full chunk.
+
+Example Usage:
+
+    $ cat puzzles.txt | python stream.py -p 4 -e bitmask -t 0.5 --stats > solutions.txt
+"""
+import argparse
+import os
+import sys
+import time
+
+from collections import namedtuple
+from functools import partial
+from multiprocessing import Pool
+
+from solution import ENGINES, SearchTimeout, SolverStats, imap_chunks, read_grids, solve
+from utils import *
+
+Outcome = namedtuple("Outcome", "grid status solution seconds nodes")
+
+
+def solve_one(grid, engine='search', timeout=None):
+    """Solve one puzzle line and describe the outcome
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid
+
+    engine(string)
+        the name of the engine in `solution.ENGINES`
+
+    timeout(float)
+        the wall-clock limit in seconds (None means no limit)
+
+    Returns
+    -------
+    Outcome
+        a (grid, status, solution, seconds, nodes) tuple where status is one
+        of 'solved', 'unsolvable', 'timeout' or 'invalid', and solution is the
+        solved grid string or None
+    """
+    if len(grid) != len(boxes) or any(val != '.' and val not in cols for val in grid):
+        return Outcome(grid, 'invalid', None, 0., 0)
+    stats = SolverStats()
+    start = time.perf_counter()
+    try:
+        values = solve(grid, engine, stats=stats, max_seconds=timeout)
+        status = 'solved' if values else 'unsolvable'
+    except SearchTimeout:
+        values, status = False, 'timeout'
+    seconds = time.perf_counter() - start
+    return Outcome(grid, status, values2grid(values) if values else None, seconds, stats.nodes)
+
+
+def _solve_chunk(grids, engine, timeout):
+    return [solve_one(grid, engine, timeout) for grid in grids]
+
+
+def solve_stream(grids, engine='search', workers=None, timeout=None, chunksize=64, window=None):
+    """Solve puzzles as they are read, keeping a bounded number of them in flight
+
+    Parameters
+    ----------
+    grids(string or iterable)
+        the path of a file with one puzzle per line, or an iterable of lines
+
+    engine(string)
+        the name of the engine in `solution.ENGINES`
+
+    workers(int)
+        the number of worker processes; None uses every available core, and 1
+        solves the puzzles in the current process
+
+    timeout(float)
+        the wall-clock limit for each puzzle in seconds
+
+    chunksize(int)
+        the number of puzzles sent to a worker at a time (ignored when
+        workers is 1, where each puzzle is solved as soon as it is read)
+
+    window(int)
+        the maximum number of chunks submitted and not yet written; defaults
+        to twice the number of workers
+
+    Yields
+    ------
+    Outcome
+        one outcome per puzzle, in input order
+    """
+    grids = read_grids(grids)
+    if workers == 1:
+        for grid in grids:
+            yield solve_one(grid, engine, timeout)
+        return
+    window = window or 2 * (workers or os.cpu_count())
+    function = partial(_solve_chunk, engine=engine, timeout=timeout)
+    with Pool(workers) as pool:
+        for outcomes in imap_chunks(pool, function, grids, chunksize, window):
+            yield from outcomes
+
+
+def print_summary(counts, seconds, slowest, nodes, file=sys.stderr):
+    puzzles = sum(counts.values())
+    print("puzzles: {}".format(puzzles), file=file)
+    for status in ('solved', 'unsolvable', 'timeout', 'invalid'):
+        print("{}: {}".format(status, counts.get(status, 0)), file=file)
+    print("nodes: {}".format(nodes), file=file)
+    print("total solve time: {:.3f} s".format(seconds), file=file)
+    print("mean solve time: {:.3f} ms".format(1000 * seconds / puzzles if puzzles else 0.), file=file)
+    print("max solve time: {:.3f} ms".format(1000 * slowest), file=file)
+
+
+def main(args):
+    source = sys.stdin if args.input == '-' else args.input
+    counts = {}
+    seconds = slowest = 0.
+    nodes = 0
+    chunksize = args.chunksize or (1 if args.input == '-' else 64)
+    outcomes = solve_stream(source, args.engine, args.processes, args.timeout, chunksize)
+    for outcome in outcomes:
+        print(outcome.solution or outcome.status, flush=True)
+        counts[outcome.status] = counts.get(outcome.status, 0) + 1
+        seconds += outcome.seconds
+        slowest = max(slowest, outcome.seconds)
+        nodes += outcome.nodes
+    if args.stats:
+        print_summary(counts, seconds, slowest, nodes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve diagonal Sudoku puzzles read one per line.")
+    parser.add_argument('input', nargs='?', default='-', help="Puzzle file with one puzzle per line (default: stdin).")
+    parser.add_argument(
+        '-e', '--engine', default='search', choices=sorted(ENGINES),
+        help="Solver engine (default: search)."
+    )
+    parser.add_argument(
+        '-p', '--processes', type=int, default=None,
+        help="Number of worker processes (default: one per core)."
+    )
+    parser.add_argument(
+        '-t', '--timeout', type=float, default=None,
+        help="Wall-clock limit per puzzle in seconds (default: none)."
+    )
+    parser.add_argument(
+        '-c', '--chunksize', type=int, default=None,
+        help="Number of puzzles sent to a worker at a time (default: 1 for stdin, 64 for a file)."
+    )
+    parser.add_argument('--stats', action="store_true", help="Print a summary to stderr when the input ends.")
+    main(parser.parse_args())
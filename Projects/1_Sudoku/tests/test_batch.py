@@ -0,0 +1,34 @@
+import unittest
+
+import batch
+import solution
+from tests import test_solution as ts
+
+
+class TestBatch(unittest.TestCase):
+    grids = [ts.TestDiagonalSudoku.diagonal_grid,
+             '11' + '.' * 79,
+             solution.values2grid(ts.TestDiagonalSudoku.solved_diag_sudoku)]
+
+    def test_roundtrip(self):
+        candidates = batch.grids2array(self.grids)
+        self.assertEqual(candidates.shape, (3, 81, 9))
+        self.assertEqual(batch.array2values(candidates[0]), solution.grid2values(self.grids[0]))
+
+    def test_propagate_matches_reduce(self):
+        values = solution.grid2values(self.grids[0])
+        for _ in range(20):
+            values = solution.only_choice(solution.eliminate(values))
+        candidates, failed = batch.propagate(batch.grids2array(self.grids))
+        self.assertEqual(list(failed), [False, True, False])
+        self.assertEqual(batch.array2values(candidates[0]), values)
+
+    def test_solve_batch(self):
+        results = batch.solve_batch(self.grids)
+        self.assertEqual(results, [ts.TestDiagonalSudoku.solved_diag_sudoku, False,
+                                   ts.TestDiagonalSudoku.solved_diag_sudoku])
+        self.assertEqual(batch.solve_batch([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import benchmark
+from tests import test_solution as ts
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(samples, 50), 50)
+        self.assertEqual(benchmark.percentile(samples, 99), 99)
+        self.assertEqual(benchmark.percentile(samples, 100), 100)
+        self.assertEqual(benchmark.percentile([3], 90), 3)
+
+    def test_run_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = os.path.join(tmp, "diag.txt")
+            with open(corpus, "w") as f:
+                f.write(ts.TestDiagonalSudoku.diagonal_grid + "\n\n" + "11" + "." * 79 + "\n" + "puzzle\n")
+            runs = list(benchmark.run_benchmark([corpus], ["search", "trail"], memory=True))
+            self.assertEqual([(run.index, run.engine) for run in runs],
+                             [(0, "search"), (0, "trail"), (1, "search"), (1, "trail"),
+                              (2, "search"), (2, "trail")])
+            self.assertEqual([run.status for run in runs],
+                             ["solved", "solved", "unsolvable", "unsolvable", "invalid", "invalid"])
+            self.assertTrue(all(run.nodes >= 1 and run.peak_bytes > 0 for run in runs[:4]))
+
+            summary = benchmark.summarize(runs)
+            self.assertEqual([(row["engine"], row["puzzles"], row["solved"], row["invalid"]) for row in summary],
+                             [("search", 3, 1, 1), ("trail", 3, 1, 1)])
+            benchmark.write_csv(os.path.join(tmp, "runs.csv"), runs)
+            benchmark.write_json(os.path.join(tmp, "summary.json"), summary, runs)
+
+    def test_invalid_lines(self):
+        geometry = benchmark.Geometry(2)
+        self.assertTrue(benchmark.is_valid('1...' + '.' * 12, geometry))
+        self.assertFalse(benchmark.is_valid('5...' + '.' * 12, geometry))
+        self.assertFalse(benchmark.is_valid(ts.TestDiagonalSudoku.diagonal_grid[:80]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import bitboard
+import solution
+from utils import grid2values
+
+from tests import test_solution as ts
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_roundtrip(self):
+        values = ts.TestNakedTwins.before_naked_twins_1
+        self.assertEqual(bitboard.masks2values(bitboard.values2masks(values)), values)
+
+    def test_grid2masks(self):
+        grid = ts.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(bitboard.grid2masks(grid), bitboard.values2masks(grid2values(grid)))
+
+    def test_naked_twins(self):
+        for before, solutions in ((ts.TestNakedTwins.before_naked_twins_1, ts.TestNakedTwins.possible_solutions_1),
+                                  (ts.TestNakedTwins.before_naked_twins_2, ts.TestNakedTwins.possible_solutions_2)):
+            masks = bitboard.naked_twins(bitboard.values2masks(before))
+            self.assertIn(bitboard.masks2values(masks), solutions)
+
+    def test_solve(self):
+        grid = ts.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(bitboard.solve(grid), ts.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_matches_solution(self):
+        grid = "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."
+        self.assertEqual(bitboard.solve(grid), solution.solve(grid))
+
+
+if __name__ == '__main__':
+    unittest.main()
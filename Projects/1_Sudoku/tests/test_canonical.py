@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+import canonical
+import solution
+from tests import test_solution as ts
+
+
+def transform(grid, symmetry, digits):
+    """Apply a board symmetry and a digit relabelling to a grid"""
+    image = ''.join(grid[i] for i in symmetry)
+    return image.translate(str.maketrans(solution.cols, digits))
+
+
+class TestCanonical(unittest.TestCase):
+    grid = ts.TestDiagonalSudoku.diagonal_grid
+    solved = solution.values2grid(ts.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_symmetries_keep_units(self):
+        self.assertEqual(len(canonical.SYMMETRIES), 96)
+        units = {frozenset(solution.boxes.index(box) for box in unit) for unit in solution.unitlist}
+        for symmetry in canonical.SYMMETRIES:
+            self.assertEqual({frozenset(symmetry[i] for i in unit) for unit in units}, units)
+
+    def test_canonical_form(self):
+        expected = canonical.canonicalize(self.grid)
+        for symmetry in canonical.SYMMETRIES[::7]:
+            equivalent = transform(self.grid, symmetry, '528397164')
+            self.assertEqual(canonical.canonicalize(equivalent), expected)
+        form, symmetry, table = canonical.canonical_form(self.solved)
+        self.assertEqual(canonical.from_canonical(form, symmetry, table), self.solved)
+
+    def test_canonical_form_is_smallest_image(self):
+        for grid in (self.grid, self.solved, '.' * 81, '.' * 40 + '7' + '.' * 40):
+            images = [''.join(grid[i] for i in symmetry) for symmetry in canonical.SYMMETRIES]
+            smallest = min(image.translate(canonical._relabel(image)) for image in images)
+            self.assertEqual(canonical.canonicalize(grid), smallest)
+
+    def test_cache(self):
+        cache = canonical.SolutionCache(maxsize=4)
+        self.assertEqual(solution.solve(self.grid, cache=cache), ts.TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertEqual(cache.misses, 1)
+        equivalent = transform(self.grid, canonical.SYMMETRIES[-1], '987654321')
+        values = solution.solve(equivalent, cache=cache)
+        self.assertEqual(values, solution.grid2values(transform(self.solved, canonical.SYMMETRIES[-1], '987654321')))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertFalse(solution.solve('11' + '.' * 79, cache=cache))
+        self.assertFalse(solution.solve('11' + '.' * 79, cache=cache))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertLessEqual(len(cache), 4)
+
+    def test_cache_miss_computes_canonical_form_once(self):
+        cache = canonical.SolutionCache()
+        with mock.patch('canonical.canonical_form', wraps=canonical.canonical_form) as canonical_form:
+            solution.solve(self.grid, cache=cache)
+        self.assertEqual(canonical_form.call_count, 1)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'solutions')
+            cache = canonical.SolutionCache(path=path)
+            solution.solve(self.grid, cache=cache)
+            cache.close()
+            cache = canonical.SolutionCache(path=path)
+            self.assertEqual(cache.get(self.grid), ts.TestDiagonalSudoku.solved_diag_sudoku)
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
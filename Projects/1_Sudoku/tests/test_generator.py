@@ -0,0 +1,24 @@
+import unittest
+
+import generator
+import solution
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_generate(self):
+        puzzle = generator.generate(1, 'medium')
+        low, high = generator.DIFFICULTY['medium']
+        self.assertTrue(low <= puzzle.nodes <= high)
+        self.assertTrue(solution.is_unique(puzzle.grid))
+        self.assertEqual(solution.values2grid(solution.solve(puzzle.grid)), puzzle.solution)
+        self.assertEqual(puzzle.clues, 81 - puzzle.grid.count('.'))
+
+    def test_generate_many(self):
+        puzzles = list(generator.generate_many(2, 'easy', workers=1, seed=7))
+        self.assertEqual(len(puzzles), 2)
+        self.assertEqual(sorted(puzzles), sorted(generator.generate_many(2, 'easy', workers=2, seed=7)))
+
+
+if __name__ == '__main__':
+    unittest.main()
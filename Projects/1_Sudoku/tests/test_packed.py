@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import packed
+import solution
+from tests import test_solution as ts
+
+
+class TestPacked(unittest.TestCase):
+    grid = ts.TestDiagonalSudoku.diagonal_grid
+    solved = solution.values2grid(ts.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_pack(self):
+        record = packed.pack(self.grid)
+        self.assertEqual(len(record), packed.RECORD_SIZE)
+        self.assertEqual(packed.unpack(record), (self.grid, False))
+        self.assertEqual(packed.unpack(packed.pack(self.solved, True)), (self.solved, True))
+        with self.assertRaises(ValueError):
+            packed.pack('0' * 81)
+
+    def test_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "puzzles.sdk")
+            self.assertEqual(packed.write_puzzles(path, [self.grid, '.' * 81, self.solved]), 3)
+            self.assertEqual(os.path.getsize(path), packed.HEADER_SIZE + 3 * packed.RECORD_SIZE)
+            with packed.PuzzleArchive(path, writable=True) as archive:
+                self.assertEqual(len(archive), 3)
+                self.assertEqual(archive[-1].grid, self.solved)
+                self.assertEqual(list(archive.grids()), [self.grid, '.' * 81, self.solved])
+                archive[0] = solution.values2grid(solution.solve(archive[0].grid)), True
+            with packed.PuzzleArchive(path) as archive:
+                self.assertEqual(archive[0], (self.solved, True))
+                with self.assertRaises(IndexError):
+                    archive[3]
+
+    def test_create(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.sdk")
+            with packed.PuzzleArchive.create(path, 2) as archive:
+                archive[1] = self.grid, False
+            with packed.PuzzleArchive(path) as archive:
+                self.assertEqual(list(archive), [('.' * 81, False), (self.grid, False)])
+
+
+if __name__ == '__main__':
+    unittest.main()
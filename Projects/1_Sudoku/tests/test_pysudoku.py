@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+import PySudoku
+import solution
+from tests import test_solution as ts
+
+
+class TestReplay(unittest.TestCase):
+    grid = ts.TestDiagonalSudoku.diagonal_grid
+
+    def setUp(self):
+        self.history = solution.History()
+        self.result = solution.solve(self.grid, history=self.history)
+        self.frames = len(range(0, len(solution.reconstruct(self.result, self.history)), 20)) + 1
+
+    def test_png_sequence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern = os.path.join(tmp, "{:03d}.png")
+            count = PySudoku.replay(solution.grid2values(self.grid), self.result, self.history,
+                                    stride=20, output=pattern)
+            self.assertEqual(count, self.frames)
+            self.assertEqual(sorted(os.listdir(tmp)), [pattern.format(i)[len(tmp) + 1:] for i in range(count)])
+
+    def test_gif(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "replay.gif")
+            count = PySudoku.replay(solution.grid2values(self.grid), self.result, self.history,
+                                    stride=20, output=path)
+            self.assertEqual(count, self.frames)
+            with Image.open(path) as image:
+                self.assertEqual(image.n_frames, count)
+                self.assertEqual(image.size, (700, 700))
+
+
+if __name__ == '__main__':
+    unittest.main()
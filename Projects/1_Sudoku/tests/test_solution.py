@@ -3,9 +3,12 @@ tests does not guarantee that your solution is correct. The Project Asssistant t
 many additional test cases that you must also pass to complete the project. You should write your
 own additional test cases to cover any failed tests shown in the Project Assistant feedback.
 """
+import itertools
 import unittest
 import solution
 
+from unittest import mock
+
 
 class TestNakedTwins(unittest.TestCase):
     before_naked_twins_1 = {'I6': '4', 'H9': '3', 'I2': '6', 'E8': '1', 'H3': '5', 'H7': '8', 'I7': '1', 'I4': '8',
@@ -81,6 +84,16 @@ class TestNakedTwins(unittest.TestCase):
                         "Your naked_twins function produced an unexpected board.")
 
 
+    def test_naked_twins_shared_peers(self):
+        values = solution.grid2values('.' * 81)
+        values['A1'] = values['A2'] = '12'
+        out = solution.naked_twins(values)
+        self.assertEqual(out['A9'], '3456789')
+        self.assertEqual(out['C3'], '3456789')
+        self.assertEqual(out['D1'], '123456789')
+        self.assertEqual(values['A9'], '123456789')
+
+
 
 class TestDiagonalSudoku(unittest.TestCase):
     diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
@@ -99,5 +112,304 @@ class TestDiagonalSudoku(unittest.TestCase):
     def test_solve(self):
         self.assertEqual(solution.solve(self.diagonal_grid), self.solved_diag_sudoku)
 
+
+class TestPropagate(unittest.TestCase):
+
+    def test_solve_incremental(self):
+        self.assertEqual(solution.solve(TestDiagonalSudoku.diagonal_grid, engine='incremental'),
+                         TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_matches_reduce_puzzle(self):
+        values = solution.grid2values(TestDiagonalSudoku.diagonal_grid)
+        self.assertEqual(solution.propagate(values.copy()), solution.reduce_puzzle(values.copy()))
+
+    def test_reduce_puzzle_incremental(self):
+        values = solution.grid2values(TestDiagonalSudoku.diagonal_grid)
+        stats = solution.SolverStats()
+        self.assertEqual(solution.reduce_puzzle(values.copy(), incremental=True, stats=stats),
+                         solution.reduce_puzzle(values.copy()))
+        self.assertGreater(stats.propagations, 0)
+        with self.assertRaises(ValueError):
+            solution.reduce_puzzle(values.copy(), incremental=True, strategies=['eliminate'])
+
+    def test_contradiction(self):
+        values = solution.grid2values('11' + '.' * 79)
+        self.assertFalse(solution.propagate(values))
+
+
+class TestSearchTrail(unittest.TestCase):
+
+    def test_engines(self):
+        for engine in solution.ENGINES:
+            self.assertEqual(solution.solve(TestDiagonalSudoku.diagonal_grid, engine=engine),
+                             TestDiagonalSudoku.solved_diag_sudoku, engine)
+
+    def test_engines_valid(self):
+        # this puzzle has several solutions, so the engines may not agree on one
+        grid = "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."
+        for engine in solution.ENGINES:
+            result = solution.solve(grid, engine=engine)
+            for unit in solution.unitlist:
+                self.assertEqual(sorted(result[box] for box in unit), list('123456789'), engine)
+            self.assertTrue(all(v in ('.', result[box]) for v, box in zip(grid, solution.boxes)))
+
+    def test_undo(self):
+        values = solution.grid2values(TestDiagonalSudoku.diagonal_grid)
+        before = values.copy()
+        trail = []
+        solution.propagate(values, None, trail)
+        self.assertNotEqual(values, before)
+        solution.undo(values, trail, 0)
+        self.assertEqual(values, before)
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.solve('11' + '.' * 79, engine='trail'))
+
+
+class TestCountSolutions(unittest.TestCase):
+
+    def test_unique(self):
+        self.assertEqual(solution.count_solutions(TestDiagonalSudoku.diagonal_grid), 1)
+        self.assertTrue(solution.is_unique(TestDiagonalSudoku.diagonal_grid))
+
+    def test_limit(self):
+        grid = "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."
+        self.assertEqual(solution.count_solutions(grid, limit=5), 5)
+        self.assertFalse(solution.is_unique(grid))
+
+    def test_non_positive_limit(self):
+        stats = solution.SolverStats()
+        for limit in (0, -1):
+            self.assertEqual(solution.count_solutions('.' * 81, limit=limit, stats=stats), 0)
+        self.assertEqual(stats.nodes, 0)
+
+    def test_count_all(self):
+        self.assertEqual(solution.count_solutions('11' + '.' * 79), 0)
+        values = solution.grid2values(solution.values2grid(TestDiagonalSudoku.solved_diag_sudoku))
+        self.assertEqual(len(list(solution.iter_solutions(values))), 1)
+
+
+class TestBudget(unittest.TestCase):
+
+    def test_node_budget(self):
+        for engine in solution.ENGINES:
+            stats = solution.SolverStats()
+            with self.assertRaises(solution.SearchTimeout) as raised:
+                solution.solve('.' * 81, engine, stats=stats, max_nodes=3)
+            self.assertEqual(raised.exception.reason, 'nodes')
+            self.assertEqual(stats.nodes, 4)
+
+    def test_time_budget(self):
+        with self.assertRaises(solution.SearchTimeout) as raised:
+            solution.solve('.' * 81, 'dlx', max_seconds=0)
+        self.assertEqual(raised.exception.reason, 'seconds')
+        self.assertEqual(solution.solve(TestDiagonalSudoku.diagonal_grid, max_nodes=1000, max_seconds=60),
+                         TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_time_budget_stats(self):
+        # a clock that advances one second per reading runs out mid-search
+        for engine in solution.ENGINES:
+            stats = solution.SolverStats()
+            clock = itertools.count()
+            with mock.patch('time.perf_counter', lambda: float(next(clock))):
+                with self.assertRaises(solution.SearchTimeout) as raised:
+                    solution.solve('.' * 81, engine, stats=stats, max_seconds=30)
+            budget = raised.exception.stats
+            self.assertEqual(raised.exception.reason, 'seconds')
+            self.assertGreater(budget.nodes, 1)
+            self.assertEqual(budget.backtracks, 0)
+            self.assertEqual((stats.nodes, stats.backtracks, stats.propagations),
+                             (budget.nodes, budget.backtracks, budget.propagations))
+
+    def test_budget_construction(self):
+        budget = solution.Budget(max_nodes=0, max_seconds=-1)
+        self.assertEqual((budget.nodes, budget.backtracks, budget.propagations), (0, 0, 0))
+        budget.nodes = 0
+        with self.assertRaises(solution.SearchTimeout):
+            budget.nodes += 1
+
+
+class TestDLX(unittest.TestCase):
+
+    def test_unsolvable(self):
+        self.assertFalse(solution.solve('11' + '.' * 79, engine='dlx'))
+
+    def test_geometry(self):
+        geometry = solution.Geometry(2, diagonal=True)
+        result = solution.solve('1...' + '.' * 12, engine='dlx', geometry=geometry)
+        for unit in geometry.unitlist:
+            self.assertEqual(sorted(result[box] for box in unit), list('1234'))
+
+    def test_stats(self):
+        stats = solution.SolverStats()
+        solution.solve(TestDiagonalSudoku.diagonal_grid, engine='dlx', stats=stats)
+        self.assertGreaterEqual(stats.nodes, 81 - TestDiagonalSudoku.diagonal_grid.count('.'))
+
+
+class TestStrategies(unittest.TestCase):
+
+    def test_strategies_keep_solution(self):
+        solved = TestDiagonalSudoku.solved_diag_sudoku
+        for name, strategy in solution.STRATEGIES.items():
+            values = solution.eliminate(solution.grid2values(TestDiagonalSudoku.diagonal_grid))
+            values = strategy(values)
+            for box, digit in solved.items():
+                self.assertIn(digit, values[box], name)
+
+    def test_x_wing(self):
+        values = solution.grid2values('.' * 81)
+        for box in solution.boxes:
+            if box[0] in 'AE' and box[1] not in '27':
+                values[box] = '23456789'
+        values = solution.x_wing(values)
+        self.assertEqual(values['C2'], '23456789')
+        self.assertEqual(values['E7'], '123456789')
+        self.assertEqual(values['C3'], '123456789')
+
+    def test_stats(self):
+        stats = solution.SolverStats()
+        strategies = tuple(solution.STRATEGIES)
+        result = solution.solve(TestDiagonalSudoku.diagonal_grid, strategies=strategies, stats=stats)
+        self.assertEqual(result, TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertEqual(set(stats.calls), set(strategies))
+        self.assertGreater(stats.eliminations['eliminate'], 0)
+
+    def test_unsupported_engine(self):
+        with self.assertRaises(ValueError):
+            solution.solve(TestDiagonalSudoku.diagonal_grid, engine='trail', strategies=('x_wing',))
+
+
+class TestHistory(unittest.TestCase):
+    grid = "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."
+
+    def test_modes(self):
+        paths = {}
+        for mode in solution.History.MODES:
+            history = solution.History(mode)
+            result = solution.solve(self.grid, history=history)
+            paths[mode] = solution.reconstruct(result, history)
+        self.assertEqual(paths['off'], [])
+        self.assertTrue(paths['delta'])
+        self.assertTrue(paths['full'])
+        self.assertTrue(set(paths['full']) <= set(paths['delta']))
+
+    def test_backtracking(self):
+        grid = ".6......1853..6........35.6..6....9..8...26.7..96.......2...8.....2..7.....56...."
+        history = solution.History('delta')
+        stats = solution.SolverStats()
+        result = solution.solve(grid, history=history, stats=stats)
+        self.assertGreater(stats.backtracks, 0)
+        path = solution.reconstruct(result, history)
+        self.assertTrue(path)
+        # each box is assigned at most once, on the path that led to the solution
+        self.assertEqual(len({box for box, _ in path}), len(path))
+        for box, value in path:
+            self.assertEqual(grid[solution.boxes.index(box)], '.')
+            self.assertEqual(result[box], value)
+
+    def test_scoped(self):
+        history = solution.History('delta')
+        with solution.recording(history):
+            solution.search(solution.grid2values(self.grid))
+        steps = len(history.steps)
+        solution.solve(self.grid)
+        self.assertEqual(len(history.steps), steps)
+        self.assertEqual(solution.history, {})
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            solution.History('verbose')
+
+
+class TestGeometry(unittest.TestCase):
+
+    def assertSolved(self, values, geometry):
+        for unit in geometry.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(geometry.digits))
+
+    def test_standard_diagonal(self):
+        geometry = solution.Geometry(3, diagonal=True)
+        self.assertEqual([list(unit) for unit in geometry.unitlist], solution.unitlist)
+        self.assertIs(geometry.peers, solution.peers)
+        self.assertIs(solution.Geometry(3, True).units, geometry.units)
+        self.assertEqual(solution.Geometry(4), solution.Geometry(4))
+        with self.assertRaises(TypeError):
+            geometry.peers['A1'] = frozenset()
+
+    def test_grid_roundtrip(self):
+        geometry = solution.Geometry(4)
+        grid = '1.3.' * 64
+        values = solution.grid2values(grid, geometry)
+        self.assertEqual(values['A2'], '123456789ABCDEFG')
+        self.assertEqual(values['P15'], '3')
+        self.assertEqual(solution.values2grid(values, geometry), grid)
+
+    def test_solve_larger_boards(self):
+        for size in (2, 4, 5):
+            geometry = solution.Geometry(size, diagonal=(size == 4))
+            solved = solution.solve('.' * size ** 4, geometry=geometry)
+            self.assertSolved(solved, geometry)
+            grid = solution.values2grid(solved, geometry)
+            puzzle = ''.join('.' if i % 2 else v for i, v in enumerate(grid))
+            result = solution.solve(puzzle, geometry=geometry)
+            self.assertSolved(result, geometry)
+            self.assertTrue(all(v in ('.', result[box]) for v, box in zip(puzzle, geometry.boxes)))
+
+    def test_unsupported_engine(self):
+        with self.assertRaises(ValueError):
+            solution.solve('.' * 16, engine='trail', geometry=solution.Geometry(2))
+        with self.assertRaises(ValueError):
+            solution.solve('.' * 16, engine='search', geometry=solution.Geometry(2))
+
+
+class TestSolveMany(unittest.TestCase):
+    grids = [TestDiagonalSudoku.diagonal_grid,
+             "...7.9....85...31.2......7...........1..7.6......8...7.7.........3......85......."]
+
+    def test_input_order(self):
+        results = list(solution.solve_many(self.grids * 3, workers=2, chunksize=2))
+        self.assertEqual([r.grid for r in results], self.grids * 3)
+        self.assertEqual(results[0].values, TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertTrue(all(r.seconds >= 0 for r in results))
+
+    def test_single_worker(self):
+        results = list(solution.solve_many(["", self.grids[0] + "\n"], workers=1))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].values, TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_bounded_input(self):
+        read = []
+
+        def grids():
+            while True:
+                read.append(self.grids[0])
+                yield self.grids[0]
+
+        results = solution.solve_many(grids(), workers=2, chunksize=1, window=2)
+        for _ in range(3):
+            self.assertEqual(next(results).values, TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertLessEqual(len(read), 3 + 2 + 1)
+        results.close()
+
+
+class TestSolveParallel(unittest.TestCase):
+
+    def test_split(self):
+        values = solution.grid2values(TestDiagonalSudoku.diagonal_grid)
+        self.assertEqual(list(solution.split(values, 0)), [solution.propagate(dict(values))])
+        grid = TestSolveMany.grids[1]
+        subproblems = list(solution.split(solution.grid2values(grid), 2))
+        self.assertTrue(len(subproblems) > 1)
+        for sub in subproblems:
+            self.assertTrue(all(v in ('.', sub[box]) for v, box in zip(grid, solution.boxes)))
+        self.assertEqual(len({solution.values2grid(sub) for sub in subproblems}), len(subproblems))
+
+    def test_solve_parallel(self):
+        grid = TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(solution.solve_parallel(grid, workers=2), TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertEqual(solution.solve_parallel(grid, depth=3, workers=1, engine='trail'),
+                         TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertFalse(solution.solve_parallel('11' + '.' * 79, workers=2))
+
 if __name__ == '__main__':
     unittest.main()
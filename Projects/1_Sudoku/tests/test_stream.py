@@ -0,0 +1,37 @@
+import unittest
+
+import stream
+from tests import test_solution as ts
+
+
+class TestStream(unittest.TestCase):
+    lines = [ts.TestDiagonalSudoku.diagonal_grid + "\n", "\n", "11" + "." * 79 + "\n", "12x\n"] * 3
+
+    def test_solve_stream(self):
+        solved = stream.solve_one(ts.TestDiagonalSudoku.diagonal_grid).solution
+        outcomes = list(stream.solve_stream(self.lines, workers=1, chunksize=2))
+        self.assertEqual([outcome.status for outcome in outcomes], ['solved', 'unsolvable', 'invalid'] * 3)
+        self.assertEqual(outcomes[0].solution, solved)
+        parallel = list(stream.solve_stream(self.lines, workers=2, chunksize=2, window=1))
+        self.assertEqual([(o.grid, o.status, o.solution) for o in parallel],
+                         [(o.grid, o.status, o.solution) for o in outcomes])
+
+    def test_lazy_input(self):
+        read = []
+
+        def lines():
+            for line in self.lines:
+                read.append(line)
+                yield line
+
+        outcomes = stream.solve_stream(lines(), workers=1, chunksize=64)
+        self.assertEqual(next(outcomes).status, 'solved')
+        self.assertEqual(len(read), 1)
+
+    def test_timeout(self):
+        outcome = stream.solve_one('.' * 81, 'dlx', timeout=1e-4)
+        self.assertEqual((outcome.status, outcome.solution), ('timeout', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,20 @@
 
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from types import MappingProxyType
 
 
 rows = 'ABCDEFGHI'
 cols = '123456789'
 boxes = [r + c for r in rows for c in cols]
-history = {}  # history must be declared here so that it exists in the assign_values scope
+history = {}  # legacy module-level history; assignments are now recorded per solve (see `recording`)
+_recording = None  # the History that assign_value records into, if any
+
+# Row labels and box symbols for boards up to 25x25; a board with N rows uses
+# the first N of each (e.g., '123456789ABCDEFG' for a 16x16 board)
+ROW_LABELS = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+SYMBOLS = '123456789ABCDEFGHIJKLMNOP'
 
 
 def extract_units(unitlist, boxes):
@@ -27,9 +36,12 @@ def extract_units(unitlist, boxes):
     """
     # the value for keys that aren't in the dictionary are initialized as an empty list
     units = defaultdict(list)
-    for current_box in boxes:
-        for unit in unitlist:
-            if current_box in unit:
+    # a single pass over the units visits each (box, unit) pair once, instead
+    # of testing every box for membership in every unit
+    wanted = set(boxes)
+    for unit in unitlist:
+        for current_box in unit:
+            if current_box in wanted:
                 # defaultdict avoids this raising a KeyError when new keys are added
                 units[current_box].append(unit)
     return units
@@ -66,10 +78,86 @@ def extract_peers(units, boxes):
     return peers
 
 
+class History:
+    """The assignments recorded by `assign_value` while solving one puzzle
+
+    Parameters
+    ----------
+    mode(string)
+        'off' records nothing; 'delta' appends each (box, value) assignment to
+        `steps`; 'full' stores a snapshot of the board before and after each
+        assignment in `snapshots`, as a dictionary of the form
+        {grid: (previous grid, (box, value))}. Only assignments of a single
+        digit are recorded.
+    """
+    MODES = ('off', 'delta', 'full')
+
+    def __init__(self, mode='delta'):
+        if mode not in self.MODES:
+            raise ValueError("Unknown history mode: {}".format(mode))
+        self.mode = mode
+        self.steps = []
+        self.snapshots = {}
+
+    def record(self, values, box, value):
+        """Assign `value` to `box` and record the assignment according to the mode"""
+        if self.mode == 'full' and len(value) == 1:
+            prev = values2grid(values)
+            values[box] = value
+            self.snapshots[values2grid(values)] = (prev, (box, value))
+            return
+        values[box] = value
+        if self.mode == 'delta' and len(value) == 1:
+            self.steps.append((box, value))
+
+    def mark(self):
+        """Return a checkpoint of the log, taken before trying a search branch"""
+        return len(self.steps)
+
+    def rewind(self, mark):
+        """Drop the assignments logged since `mark`, when their branch is abandoned
+
+        Snapshots are kept: 'full' mode follows the links back from the
+        solution, so abandoned branches are never reached.
+        """
+        del self.steps[mark:]
+
+
+@contextmanager
+def recording(history):
+    """Record the assignments made by `assign_value` into a History
+
+    Recording is scoped to the body of the with statement, so each solve can
+    keep its own history (or none at all) instead of sharing a global one.
+
+    Ex.
+        with recording(History('delta')) as history:
+            result = search(values)
+        path = reconstruct(result, history)
+    """
+    global _recording
+    previous, _recording = _recording, history
+    try:
+        yield history
+    finally:
+        _recording = previous
+
+
+def checkpoint():
+    """Return a checkpoint of the active History (see `History.mark`), or None"""
+    return None if _recording is None else _recording.mark()
+
+
+def rollback(mark):
+    """Drop the assignments recorded since a checkpoint taken by `checkpoint`"""
+    if mark is not None and _recording is not None:
+        _recording.rewind(mark)
+
+
 def assign_value(values, box, value):
     """You must use this function to update your values dictionary if you want to
     try using the provided visualization tool. This function records each assignment
-    (in order) for later reconstruction.
+    (in order) for later reconstruction, when a History is active (see `recording`).
 
     Parameters
     ----------
@@ -85,18 +173,111 @@ def assign_value(values, box, value):
     if values[box] == value:
         return values
 
-    prev = values2grid(values)
-    values[box] = value
-    if len(value) == 1:
-        history[values2grid(values)] = (prev, (box, value))
+    if _recording is None:
+        values[box] = value
+    else:
+        _recording.record(values, box, value)
     return values
 
+
 def cross(A, B):
     """Cross product of elements in A and elements in B """
     return [x+y for x in A for y in B]
 
 
-def values2grid(values):
+Tables = namedtuple("Tables", "boxes unitlist units peers")
+
+
+def unit_tables(size=3, diagonal=False):
+    """Return the unit and peer tables of an N x N board made of n x n squares
+
+    The tables are immutable (tuples, frozensets and read-only mappings) and
+    built once per (size, diagonal) pair, however the arguments are passed, so
+    every module, geometry and engine of a process shares the same ones.
+
+    Parameters
+    ----------
+    size(int)
+        the side length n of each square; the board has n * n rows and columns
+
+    diagonal(bool)
+        if True, the two main diagonals are added to the unit list
+
+    Returns
+    -------
+    Tables
+        a (boxes, unitlist, units, peers) tuple: the boxes as a tuple, the
+        units as a tuple of tuples, and read-only mappings from each box to
+        the tuple of its units and to the frozenset of its peers
+    """
+    # normalise the arguments so that every spelling of a call shares one entry
+    return _unit_tables(int(size), bool(diagonal))
+
+
+@lru_cache()
+def _unit_tables(size, diagonal):
+    n = size * size
+    board_rows = ROW_LABELS[:n]
+    board_cols = [str(c) for c in range(1, n + 1)]
+    bands = [board_rows[i:i + size] for i in range(0, n, size)]
+    stacks = [board_cols[i:i + size] for i in range(0, n, size)]
+    unitlist = [cross(r, board_cols) for r in board_rows]
+    unitlist += [cross(board_rows, [c]) for c in board_cols]
+    unitlist += [cross(rs, cs) for rs in bands for cs in stacks]
+    if diagonal:
+        unitlist.append([r + c for r, c in zip(board_rows, board_cols)])
+        unitlist.append([r + c for r, c in zip(board_rows, board_cols[::-1])])
+    boxes = tuple(cross(board_rows, board_cols))
+    unitlist = tuple(tuple(unit) for unit in unitlist)
+    units = extract_units(unitlist, boxes)
+    units = {box: tuple(units[box]) for box in boxes}
+    peers = {box: frozenset(peer for unit in units[box] for peer in unit if peer != box) for box in boxes}
+    return Tables(boxes, unitlist, MappingProxyType(units), MappingProxyType(peers))
+
+
+class Geometry:
+    """The boxes, units and peers of an N x N Sudoku board made of n x n squares
+
+    The standard board is `Geometry(3)`; sizes 2 to 5 give 4x4, 9x9, 16x16 and
+    25x25 boards. Rows are labelled with letters and columns with numbers, so
+    box names stay of the form "A1" ... "Y25", and every box holds one of the
+    first N characters of `SYMBOLS`.
+
+    Parameters
+    ----------
+    size(int)
+        the side length n of each square; the board has n * n rows and columns
+
+    diagonal(bool)
+        if True, the two main diagonals are added to the unit list
+    """
+    def __init__(self, size=3, diagonal=False):
+        if not 2 <= size <= 5:
+            raise ValueError("Unsupported square size: {}".format(size))
+        n = size * size
+        self.size = size
+        self.diagonal = diagonal
+        self.rows = ROW_LABELS[:n]
+        self.cols = [str(c) for c in range(1, n + 1)]
+        self.digits = SYMBOLS[:n]
+        # the (cached) unit and peer tables, shared by every equal geometry
+        self.boxes, self.unitlist, self.units, self.peers = unit_tables(size, diagonal)
+
+    def __eq__(self, other):
+        return isinstance(other, Geometry) and (self.size, self.diagonal) == (other.size, other.diagonal)
+
+    def __hash__(self):
+        return hash((self.size, self.diagonal))
+
+    def __reduce__(self):
+        # rebuild from the shared tables rather than pickling read-only mappings
+        return Geometry, (self.size, self.diagonal)
+
+    def __repr__(self):
+        return "Geometry({}, diagonal={})".format(self.size, self.diagonal)
+
+
+def values2grid(values, geometry=None):
     """Convert the dictionary board representation to as string
 
     Parameters
@@ -104,6 +285,9 @@ def values2grid(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    geometry(Geometry)
+        the board geometry; defaults to the standard 9x9 board
+
     Returns
     -------
     a string representing a sudoku grid.
@@ -111,14 +295,13 @@ def values2grid(values):
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
     """
     res = []
-    for r in rows:
-        for c in cols:
-            v = values[r + c]
-            res.append(v if len(v) == 1 else '.')
+    for box in (boxes if geometry is None else geometry.boxes):
+        v = values[box]
+        res.append(v if len(v) == 1 else '.')
     return ''.join(res)
 
 
-def grid2values(grid):
+def grid2values(grid, geometry=None):
     """Convert grid into a dict of {square: char} with '123456789' for empties.
 
     Parameters
@@ -127,6 +310,9 @@ def grid2values(grid):
         a string representing a sudoku grid.
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    geometry(Geometry)
+        the board geometry; defaults to the standard 9x9 board
     
     Returns
     -------
@@ -135,28 +321,37 @@ def grid2values(grid):
             Values: The value in each box, e.g., '8'. If the box has no value,
             then the value will be '123456789'.
     """
+    if geometry is None:
+        keys, digits = boxes, cols
+    else:
+        keys, digits = geometry.boxes, geometry.digits
     sudoku_grid = {}
-    for val, key in zip(grid, boxes):
+    for val, key in zip(grid, keys):
         if val == '.':
-            sudoku_grid[key] = '123456789'
+            sudoku_grid[key] = digits
         else:
             sudoku_grid[key] = val
     return sudoku_grid
 
 
-def display(values):
+def display(values, geometry=None):
     """Display the values as a 2-D grid.
 
     Parameters
     ----------
         values(dict): The sudoku in dictionary form
+        geometry(Geometry): The board geometry; defaults to the standard 9x9 board
     """
-    width = 1+max(len(values[s]) for s in boxes)
-    line = '+'.join(['-'*(width*3)]*3)
-    for r in rows:
-        print(''.join(values[r+c].center(width)+('|' if c in '36' else '')
-                      for c in cols))
-        if r in 'CF': print(line)
+    if geometry is None:
+        size, board_rows, board_cols = 3, rows, cols
+    else:
+        size, board_rows, board_cols = geometry.size, geometry.rows, geometry.cols
+    width = 1+max(len(values[r+c]) for r in board_rows for c in board_cols)
+    line = '+'.join(['-'*(width*size)]*size)
+    for i, r in enumerate(board_rows, 1):
+        print(''.join(values[r+c].center(width)+('|' if j % size == 0 and j < len(board_cols) else '')
+                      for j, c in enumerate(board_cols, 1)))
+        if i % size == 0 and i < len(board_rows): print(line)
     print()
 
 
@@ -168,10 +363,11 @@ def reconstruct(values, history):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
-    history(dict)
-        a dictionary of the form {key: (key, (box, value))} encoding a linked
-        list where each element points to the parent and identifies the value
-        assignment that connects from the parent to the current state
+    history(History or dict)
+        a History recorded in 'delta' or 'full' mode, or a dictionary of the form
+        {key: (key, (box, value))} encoding a linked list where each element
+        points to the parent and identifies the value assignment that connects
+        from the parent to the current state
 
     Returns
     -------
@@ -179,6 +375,11 @@ def reconstruct(values, history):
         a list of (box, value) assignments that can be applied in order to the
         starting Sudoku puzzle to reach the solution
     """
+    if isinstance(history, History):
+        if history.mode == 'delta':
+            # the search rolls back the assignments of abandoned branches
+            return list(history.steps)
+        history = history.snapshots
     path = []
     prev = values2grid(values)
     while prev in history:
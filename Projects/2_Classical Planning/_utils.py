@@ -159,3 +159,60 @@ def decode_state(state, fluent_map):
         else:
             fs.neg.append(fluent_map[idx])
     return fs
+
+
+def encode_bitset(fs, fluent_map):
+    """ Convert a FluentState into an integer bitset, where bit i is set when
+    fluent_map[i] is True.
+
+    Set operations on integers are much faster than rebuilding tuples or lists
+    of fluents, so planning problems use this encoding for search states.
+
+    Parameters
+    ----------
+    fs: FluentState
+        A state object represented as a FluentState
+
+    fluent_map:
+        An ordered sequence of fluents
+
+    Returns
+    -------
+    int with bit i set for each fluent_map[i] in the positive fluents of fs
+    """
+    pos = set(fs.pos)
+    return sum(1 << idx for idx, f in enumerate(fluent_map) if f in pos)
+
+
+def decode_bitset(state, fluent_map):
+    """ Convert an integer bitset into a FluentState (list of positive fluents
+    and negative fluents)
+
+    Parameters
+    ----------
+    state: int
+        A state represented as an integer bitset (see encode_bitset)
+
+    fluent_map:
+        An ordered sequence of fluents
+
+    Returns
+    -------
+    FluentState instance containing the fluents from fluent_map corresponding to set
+    bits of the input state in the pos_list, and the remaining fluents in the neg_list
+    """
+    return decode_state(bitset_to_tuple(state, len(fluent_map)), fluent_map)
+
+
+def bitset_to_tuple(state, size):
+    """ Convert an integer bitset into the ordered sequence of True/False values
+    used by encode_state """
+    return tuple([bool(state >> idx & 1) for idx in range(size)])
+
+
+def set_bits(mask):
+    """ Yield the index of every set bit of a non-negative integer """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
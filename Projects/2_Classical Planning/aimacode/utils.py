@@ -362,32 +362,44 @@ class PriorityQueue(Queue):
 
     MODIFIED FROM AIMA VERSION
         - Use heapq
-        - Use an additional dict to track membership
+        - Use an additional dict of per-item heaps to track membership and
+          the queued duplicate of each item with the lowest score
     """
 
     def __init__(self, order=None, f=lambda x: x):
         self.A = []
-        self._A = Counter()
+        self._queued = {}
+        self._seq = 0
         self.f = f
 
     def append(self, item):
-        heapq.heappush(self.A, (self.f(item), item))
-        self._A[item] += 1
+        score = self.f(item)
+        heapq.heappush(self.A, (score, item))
+        self._seq += 1
+        heapq.heappush(self._queued.setdefault(item, []), (score, self._seq, item))
 
     def __len__(self):
         return len(self.A)
 
     def pop(self):
         _, item = heapq.heappop(self.A)
-        self._A[item] -= 1
+        # the entry that came off the main heap has the lowest score of all
+        # the duplicates of item, so the head of its own heap (which may be
+        # an equal node with the same score) is returned in its place
+        duplicates = self._queued[item]
+        _, _, item = heapq.heappop(duplicates)
+        if not duplicates:
+            del self._queued[item]
         return item
 
     def __contains__(self, item):
-        return self._A[item] > 0
+        return item in self._queued
 
     def __getitem__(self, key):
-        if self._A[key] > 0:
-            return key
+        # return the queued item equal to key with the lowest score (not key
+        # itself), so callers can compare a new item against the incumbent
+        if key in self._queued:
+            return self._queued[key][0][2]
 
 # ______________________________________________________________________________
 # Useful Shorthands
@@ -1,12 +1,13 @@
 
 from copy import deepcopy
 from functools import lru_cache
-from itertools import combinations
-from collections import defaultdict, MutableSet
+from collections import defaultdict, namedtuple, MutableSet
 
 from aimacode.planning import Action
 from aimacode.utils import expr, Expr
 
+from _utils import set_bits
+
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
     ##############################################################################
@@ -79,6 +80,62 @@ class ActionNode(object):
             and self.expr == other.expr)
 
 
+ActionBits = namedtuple("ActionBits", "pre eff neg_pre neg_eff")
+ActionBits.__doc__ = """ The literal numbers of the preconditions and effects of an
+action node, and of their negations
+"""
+
+
+class NodeIndex(object):
+    """ Number the literals and actions of a planning problem so that sets of
+    them can be stored as integer bitsets (bit i stands for the i-th node)
+
+    Nodes are numbered the first time they are seen, and one index is shared
+    by every layer of a planning graph (and by every planning graph built for
+    the same problem), so the numbers and the per-action bitsets below are
+    only computed once.
+    """
+    def __init__(self):
+        self._ids = {}
+        self._negations = {}
+        self._actions = {}
+
+    def __getitem__(self, node):
+        idx = self._ids.get(node)
+        if idx is None:
+            idx = self._ids[node] = len(self._ids)
+        return idx
+
+    def get(self, node):
+        """ Return the number of a node, or None if it was never numbered """
+        return self._ids.get(node)
+
+    def mask(self, nodes):
+        """ Return the bitset of a collection of nodes """
+        bits = 0
+        for node in nodes:
+            bits |= 1 << self[node]
+        return bits
+
+    def negation(self, literal):
+        """ Return the number of the logical negation of a literal """
+        idx = self._negations.get(literal)
+        if idx is None:
+            idx = self._negations[literal] = self[~literal]
+        return idx
+
+    def action(self, action):
+        """ Return the ActionBits of an ActionNode """
+        bits = self._actions.get(action)
+        if bits is None:
+            bits = self._actions[action] = ActionBits(
+                tuple(self[p] for p in action.preconditions),
+                tuple(self[e] for e in action.effects),
+                tuple(self.negation(p) for p in action.preconditions),
+                tuple(self.negation(e) for e in action.effects))
+        return bits
+
+
 class BaseLayer(MutableSet):
     """ Base class for ActionLayer and LiteralLayer classes for planning graphs
     that stores actions or literals as a mutable set (which enables terse,
@@ -106,16 +163,21 @@ class BaseLayer(MutableSet):
         as parent, and literal layers always have an action layer as parent.
     
     _mutexes : dict
-        Mapping from each item (action or literal) to a set containing all items
-        that are mutex to the key. E.g., _mutexes[literaA] is a set of literals
-        that are mutex to literalA in this level of the planning graph
+        Mapping from each item (action or literal) to an integer bitset of all
+        items that are mutex to the key, numbered by _index. E.g., bit
+        _index[literalB] of _mutexes[literalA] is set when literalB is mutex to
+        literalA in this level of the planning graph (items with no mutexes
+        are left out)
+
+    _index : NodeIndex
+        The numbering of literals and actions, shared with the parent layer
 
     _ignore_mutexes : bool
         If _ignore_mutexes is True then _dynamic_ mutexes will be ignored (static
         mutexes are *always* enforced). For example, a literal X is always mutex
         with ~X, but "competing needs" or "inconsistent support" can be skipped
     """
-    def __init__(self, items=[], parent_layer=None, ignore_mutexes=False):
+    def __init__(self, items=[], parent_layer=None, ignore_mutexes=False, index=None):
         """
         Parameters
         ----------
@@ -127,14 +189,21 @@ class BaseLayer(MutableSet):
 
         ignore_mutexes : bool
             See _ignore_mutexes attribute
+
+        index : NodeIndex
+            See _index attribute (by default, the index of the parent layer or
+            a new one for the root of a planning graph)
         """
         super().__init__()
         self.__store = set(iter(items))
         self.parents = defaultdict(set)
         self.children = defaultdict(set)
-        self._mutexes = defaultdict(set)
+        self._mutexes = {}
         self.parent_layer = parent_layer
         self._ignore_mutexes = ignore_mutexes
+        if index is None:
+            index = parent_layer._index if parent_layer is not None else NodeIndex()
+        self._index = index
 
     def __contains__(self, item):
         return item in self.__store
@@ -160,32 +229,76 @@ class BaseLayer(MutableSet):
             pass
 
     def set_mutex(self, itemA, itemB):
-        self._mutexes[itemA].add(itemB)
-        self._mutexes[itemB].add(itemA)
+        self._mutexes[itemA] = self._mutexes.get(itemA, 0) | 1 << self._index[itemB]
+        self._mutexes[itemB] = self._mutexes.get(itemB, 0) | 1 << self._index[itemA]
 
     def is_mutex(self, itemA, itemB):
-        return itemA in self._mutexes.get(itemB, [])
+        idx = self._index.get(itemA)
+        return idx is not None and bool(self._mutexes.get(itemB, 0) >> idx & 1)
+
+    def _set_mutex_rows(self, rows):
+        """ Store the mutexes of every item from a list of (item, bitset) pairs """
+        self._mutexes = {item: row for item, row in rows if row}
 
 
 class BaseActionLayer(BaseLayer):
-    def __init__(self, actions=[], parent_layer=None, serialize=True, ignore_mutexes=False):
-        super().__init__(actions, parent_layer, ignore_mutexes)
+    def __init__(self, actions=[], parent_layer=None, serialize=True, ignore_mutexes=False, index=None):
+        super().__init__(actions, parent_layer, ignore_mutexes, index)
         self._serialize=serialize
         if isinstance(actions, BaseActionLayer):
             self.parents.update({k: set(v) for k, v in actions.parents.items()})
             self.children.update({k: set(v) for k, v in actions.children.items()})
 
     def update_mutexes(self):
-        for actionA, actionB in combinations(iter(self), 2):
-            if self._serialize and actionA.no_op == actionB.no_op == False:
-                self.set_mutex(actionA, actionB)
-            elif (self._inconsistent_effects(actionA, actionB)
-                    or self._interference(actionA, actionB)):
-                self.set_mutex(actionA, actionB)
-            elif self._ignore_mutexes:
-                continue
-            elif self._competing_needs(actionA, actionB):
-                self.set_mutex(actionA, actionB)
+        """ Mark every pair of actions that is mutex by serialization,
+        inconsistent effects, interference or (unless mutexes are ignored)
+        competing needs. This method never calls the pairwise
+        _inconsistent_effects, _interference and _competing_needs methods;
+        they are kept as reference implementations that the tests compare
+        it against.
+
+        Rather than testing all pairs, each relation is computed for one
+        action against the whole layer at once: the actions that produce or
+        require each literal are collected as bitsets, so e.g. the actions
+        interfering with A are the union of the producers of the negated
+        preconditions of A and the requirers of its negated effects.
+        """
+        index = self._index
+        actions = [(action, index[action], index.action(action)) for action in self]
+        producers = defaultdict(int)
+        requirers = defaultdict(int)
+        layer = serial = 0
+        for action, idx, bits in actions:
+            bit = 1 << idx
+            layer |= bit
+            if not action.no_op:
+                serial |= bit
+            for literal in bits.pre:
+                requirers[literal] |= bit
+            for literal in bits.eff:
+                producers[literal] |= bit
+        if not self._serialize:
+            serial = 0
+        # precondition literals that are mutex in the parent layer
+        parent_mutexes = {}
+        if not self._ignore_mutexes and self.parent_layer is not None:
+            parent_mutexes = self.parent_layer._mutexes
+
+        rows = []
+        for action, idx, bits in actions:
+            row = 0 if action.no_op else serial
+            for literal in bits.neg_eff:
+                row |= producers.get(literal, 0) | requirers.get(literal, 0)
+            for literal in bits.neg_pre:
+                row |= producers.get(literal, 0)
+            if parent_mutexes:
+                needs = 0
+                for literal in action.preconditions:
+                    needs |= parent_mutexes.get(literal, 0)
+                for literal in set_bits(needs):
+                    row |= requirers.get(literal, 0)
+            rows.append((action, row & layer & ~(1 << idx)))
+        self._set_mutex_rows(rows)
 
     def add_inbound_edges(self, action, literals):
         # inbound action edges are many-to-one
@@ -197,20 +310,47 @@ class BaseActionLayer(BaseLayer):
 
 
 class BaseLiteralLayer(BaseLayer):
-    def __init__(self, literals=[], parent_layer=None, ignore_mutexes=False):
-        super().__init__(literals, parent_layer, ignore_mutexes)
+    def __init__(self, literals=[], parent_layer=None, ignore_mutexes=False, index=None):
+        super().__init__(literals, parent_layer, ignore_mutexes, index)
         if isinstance(literals, BaseLiteralLayer):
             self.parents.update({k: set(v) for k, v in literals.parents.items()})
             self.children.update({k: set(v) for k, v in literals.children.items()})
 
     def update_mutexes(self):
-        for literalA, literalB in combinations(iter(self), 2):
-            if self._negation(literalA, literalB):
-                self.set_mutex(literalA, literalB)
-            elif self._ignore_mutexes:
-                continue
-            elif len(self.parent_layer) and self._inconsistent_support(literalA, literalB):
-                self.set_mutex(literalA, literalB)
+        """ Mark every pair of literals that is mutex by negation or (unless
+        mutexes are ignored) inconsistent support. This method never calls
+        the pairwise _negation and _inconsistent_support methods; they are
+        kept as reference implementations that the tests compare it against.
+
+        Literal B has consistent support with literal A when some action
+        achieving B is not mutex with some action achieving A, so with the
+        achievers of each literal as a bitset, B is tested against every
+        achiever of A at once by intersecting its achievers with the union of
+        the actions that are not mutex with them.
+        """
+        index = self._index
+        literals = [(literal, index[literal]) for literal in self]
+        layer = 0
+        for _, idx in literals:
+            layer |= 1 << idx
+        parent = self.parent_layer
+        support = not self._ignore_mutexes and parent is not None and len(parent)
+        if support:
+            achievers = [(idx, index.mask(self.parents.get(literal, ()))) for literal, idx in literals]
+
+        rows = []
+        for literal, idx in literals:
+            row = layer & 1 << index.negation(literal)
+            if support:
+                # the actions that are not mutex with some achiever of the literal
+                allowed = 0
+                for action in self.parents.get(literal, ()):
+                    allowed |= ~parent._mutexes.get(action, 0)
+                for other, others in achievers:
+                    if not others & allowed:
+                        row |= 1 << other
+            rows.append((literal, row & ~(1 << idx)))
+        self._set_mutex_rows(rows)
 
     def add_inbound_edges(self, action, literals):
         # inbound literal edges are many-to-many
@@ -3,6 +3,7 @@ from itertools import chain, combinations
 from aimacode.planning import Action
 from aimacode.utils import expr
 
+from _utils import bitset_to_tuple
 from layers import BaseActionLayer, BaseLiteralLayer, makeNoOp, make_node
 
 
@@ -113,8 +114,9 @@ class PlanningGraph:
         problem : PlanningProblem
             An instance of the PlanningProblem class
 
-        state : tuple(bool)
-            An ordered sequence of True/False values indicating the literal value
+        state : int or tuple(bool)
+            An integer bitset (bit i set when problem.state_map[i] is True), or an
+            ordered sequence of True/False values indicating the literal value
             of the corresponding fluent in problem.state_map
 
         serialize : bool
@@ -134,8 +136,11 @@ class PlanningGraph:
         
         # initialize the planning graph by finding the literals that are in the
         # first layer and finding the actions they they should be connected to
+        if isinstance(state, int):
+            state = bitset_to_tuple(state, len(problem.state_map))
         literals = [s if f else ~s for f, s in zip(state, problem.state_map)]
-        layer = LiteralLayer(literals, ActionLayer(), self._ignore_mutexes)
+        index = getattr(problem, 'node_index', None)
+        layer = LiteralLayer(literals, ActionLayer(index=index), self._ignore_mutexes)
         layer.update_mutexes()
         self.literal_layers = [layer]
         self.action_layers = []
@@ -181,19 +186,14 @@ class PlanningGraph:
         --------
         Russell-Norvig 10.3.1 (3rd Edition)
         """
-        # TODO: implement this function
-        
-        # initialize costs
-        costs=[]
-        # fill planning graph until it levels off
-        self.fill()
-        
-        # self.goal is a set
-        for g in self.goal:
-            costs.append(self.level_cost(g))
-        
-        return sum(costs)
-        
+        # extend the graph one level at a time, recording the level at which
+        # each goal first appears, and stop as soon as every goal is met
+        costs = {}
+        for level, layer in self._levels():
+            costs.update((g, level) for g in self.goal if g not in costs and g in layer)
+            if len(costs) == len(self.goal):
+                return sum(costs.values())
+        return float('inf')
 
     def h_maxlevel(self):
         """ Calculate the max level heuristic for the planning graph
@@ -222,14 +222,13 @@ class PlanningGraph:
         -----
         WARNING: you should expect long runtimes using this heuristic with A*
         """
-        # TODO: implement maxlevel heuristic
-        
-        # initialize costs
-        costs= []
-        self.fill()
-        for g in self.goal:
-            costs.append(self.level_cost(g))
-        return max(costs)
+        # the max level is the level at which the last goal first appears
+        met = set()
+        for level, layer in self._levels():
+            met.update(g for g in self.goal if g in layer)
+            if len(met) == len(self.goal):
+                return level
+        return float('inf')
 
     def h_setlevel(self):
         """ Calculate the set level heuristic for the planning graph
@@ -253,30 +252,28 @@ class PlanningGraph:
         -----
         WARNING: you should expect long runtimes using this heuristic on complex problems
         """
-        # TODO: implement setlevel heuristic
-        
-        # fill the graph until level-off
-        self.fill()        
-        
-        for i_layer, lyr in enumerate(self.literal_layers):                       
-            """ make sure the goals are met in the layer """
-            all_goal_met= True
-            for g in self.goal:
-                if not g in lyr:
-                    all_goal_met= False
-            # if not met goal, try next layer        
-            if all_goal_met== False:        
+        # mutexes only ever disappear from later layers, so the first layer
+        # where all goals are present and pairwise non-mutex is the set level
+        goals = list(self.goal)
+        for level, layer in self._levels():
+            if not all(g in layer for g in goals):
                 continue
-            
-            """ make sure no pair of goal literals are mutex"""
-            goals_are_mutex = False
-            for goalA in self.goal:
-                for goalB in self.goal:
-                    if lyr.is_mutex(goalA, goalB):
-                        goals_are_mutex= True
-                if not goals_are_mutex:
-                    return i_layer
-        
+            if not any(layer.is_mutex(goalA, goalB) for goalA, goalB in combinations(goals, 2)):
+                return level
+        return float('inf')
+
+    def _levels(self):
+        """ Yield (level, literal layer) pairs, extending the graph one level at a
+        time only when the caller asks for the next level, until it levels off
+        """
+        level = 0
+        while True:
+            while level < len(self.literal_layers):
+                yield level, self.literal_layers[level]
+                level += 1
+            if self._is_leveled:
+                return
+            self._extend()
 
     ##############################################################################
     #                     DO NOT MODIFY CODE BELOW THIS LINE                     #
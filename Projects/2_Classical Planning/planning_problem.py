@@ -1,22 +1,111 @@
 
+from collections import namedtuple, OrderedDict
 from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
 
 from aimacode.logic import PropKB
 from aimacode.search import Node, Problem
 
-from _utils import encode_state, decode_state
+from _utils import bitset_to_tuple, encode_bitset, set_bits as _bits
+from layers import NodeIndex
 from my_planning_graph import PlanningGraph
+from relaxed_plan import RelaxedPlanEngine
 
     ##############################################################################
     #                 YOU DO NOT NEED TO MODIFY CODE IN THIS FILE                #
     ##############################################################################
 
 
+CompiledAction = namedtuple("CompiledAction", "action pre_pos pre_neg add rem")
+CompiledAction.__doc__ = """ An action with its preconditions and effects as bitset masks
+
+Bit i of each mask stands for the fluent state_map[i], so the action applies
+to a state when `state & pre_pos == pre_pos and not state & pre_neg`, and
+its successor is `(state & ~rem) | add`.
+"""
+
+
 class BasePlanningProblem(Problem):
+    """ Planning problem whose states are integer bitsets over state_map
+
+    Bit i of a state is set when the fluent state_map[i] is True (see
+    _utils.encode_bitset). Subclasses set `actions_list` after calling this
+    constructor, so the precondition and effect masks of the actions are
+    compiled the first time they are needed.
+    """
     def __init__(self, initial, goal):
         self.state_map = sorted(initial.pos + initial.neg, key=str)
-        self.initial_state_TF = encode_state(initial, self.state_map)
-        super().__init__(self.initial_state_TF, goal=goal)
+        self.fluent_index = {fluent: idx for idx, fluent in enumerate(self.state_map)}
+        self.goal_mask = self.fluents_mask(goal)
+        self._compiled = None
+        self._compiled_from = None
+        self._relaxed = None
+        # numbers planning graph nodes once for every graph built for this problem
+        self.node_index = NodeIndex()
+        super().__init__(encode_bitset(initial, self.state_map), goal=goal)
+
+    @property
+    def initial_state_TF(self):
+        """ The initial state as a tuple of True/False values over state_map """
+        return bitset_to_tuple(self.initial, len(self.state_map))
+
+    def fluents_mask(self, fluents):
+        """ Return the bitset of the fluents that are in state_map """
+        return sum(1 << self.fluent_index[f] for f in set(fluents) if f in self.fluent_index)
+
+    @property
+    def compiled_actions(self):
+        """ Mapping from each action in actions_list (in order) to its CompiledAction """
+        return self._compile_actions()
+
+    def _compile_actions(self):
+        """ Compile actions_list (again, if it was replaced) and index the result """
+        if self._compiled_from is not self.actions_list:
+            self._compiled = OrderedDict((action, self._compile(action)) for action in self.actions_list)
+            self._compiled_from = self.actions_list
+            self._index_preconditions()
+        return self._compiled
+
+    def _index_preconditions(self):
+        """ Index every action under one of its positive preconditions
+
+        Each action "watches" the fluent of its positive preconditions that the
+        fewest actions need, so a state only has to check the actions watching
+        one of its True fluents (plus the few actions without positive
+        preconditions) instead of scanning the whole actions_list.
+        """
+        need = [0] * len(self.state_map)
+        for c in self._compiled.values():
+            for idx in _bits(c.pre_pos):
+                need[idx] += 1
+        self._watchers = [[] for _ in self.state_map]
+        self._unwatched = []
+        for order, c in enumerate(self._compiled.values()):
+            if c.pre_pos == -1:
+                continue
+            watched = min(_bits(c.pre_pos), key=lambda idx: need[idx], default=None)
+            if watched is None:
+                self._unwatched.append((order, c))
+            else:
+                self._watchers[watched].append((order, c))
+
+    @property
+    def relaxed_plan_engine(self):
+        """ RelaxedPlanEngine for the current actions_list, built on first use """
+        actions = self._compile_actions()
+        if self._relaxed is None or self._relaxed[0] is not actions:
+            self._relaxed = actions, RelaxedPlanEngine(self)
+        return self._relaxed[1]
+
+    def _compile(self, action):
+        pre_pos = self.fluents_mask(action.precond_pos)
+        pre_neg = self.fluents_mask(action.precond_neg)
+        # a precondition on a fluent outside state_map can never be satisfied
+        if any(f not in self.fluent_index for f in chain(action.precond_pos, action.precond_neg)):
+            pre_pos = pre_neg = -1
+        return CompiledAction(action, pre_pos, pre_neg,
+                              self.fluents_mask(action.effect_add), self.fluents_mask(action.effect_rem))
 
     @lru_cache()
     def h_unmet_goals(self, node):
@@ -25,7 +114,7 @@ class BasePlanningProblem(Problem):
         conditions by ignoring the preconditions required for an action to be
         executed.
         """
-        return sum(1 for i, f in enumerate(self.state_map) if not node.state[i] and f in self.goal)
+        return bin(self.goal_mask & ~node.state).count('1')
 
     @lru_cache()
     def h_pg_levelsum(self, node):
@@ -71,33 +160,64 @@ class BasePlanningProblem(Problem):
         score = pg.h_setlevel()
         return score
 
+    @lru_cache()
+    def h_max(self, node):
+        """ This heuristic relaxes the problem by ignoring delete effects and
+        estimates the cost of the goal set as the cost of its most expensive
+        goal, where the cost of each literal is the cheapest way to reach it
+        in the relaxed problem. It equals h_pg_maxlevel and is admissible,
+        but it is computed without building a planning graph.
+
+        See Also
+        --------
+        Bonet & Geffner, "Planning as Heuristic Search" (2001)
+        """
+        return self.relaxed_plan_engine.h_max(node.state)
+
+    @lru_cache()
+    def h_add(self, node):
+        """ This heuristic relaxes the problem by ignoring delete effects and
+        estimates the cost of the goal set as the sum of the costs of its
+        goals, where the cost of an action is one more than the sum of the
+        costs of its preconditions. It is informative but not admissible.
+
+        See Also
+        --------
+        Bonet & Geffner, "Planning as Heuristic Search" (2001)
+        """
+        return self.relaxed_plan_engine.h_add(node.state)
+
+    @lru_cache()
+    def h_ff(self, node):
+        """ This heuristic counts the actions of a plan for the relaxed problem
+        (without delete effects), extracted backwards from the goals along
+        the cheapest supporters found by h_add. Unlike h_add, an action that
+        achieves several goals is only counted once.
+
+        See Also
+        --------
+        Hoffmann & Nebel, "The FF Planning System" (2001)
+        """
+        return self.relaxed_plan_engine.h_ff(node.state)
+
     def actions(self, state):
         """ Return the actions that can be executed in the given state. """
-        possible_actions = []
-        fluent = decode_state(state, self.state_map)
-        for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in fluent.pos:
-                    is_possible = False
-                    break
-            if not is_possible: continue
-            for clause in action.precond_neg:
-                if clause not in fluent.neg:
-                    is_possible = False
-                    break
-            if is_possible: possible_actions.append(action)
-        return possible_actions
+        self._compile_actions()
+        candidates = list(self._unwatched)
+        for idx in _bits(state):
+            candidates.extend(self._watchers[idx])
+        # keep the order of actions_list, which the uninformed searches rely on
+        candidates.sort(key=itemgetter(0))
+        return [c.action for _, c in candidates
+                if state & c.pre_pos == c.pre_pos and not state & c.pre_neg]
 
     def result(self, state, action):
         """ Return the state that results from executing the given action in the
         given state. The action must be one of self.actions(state).
         """
-        return tuple([
-            (f and s not in action.effect_rem) or (s in action.effect_add)
-            for f, s in zip(state, self.state_map)
-        ])
+        c = self._compile_actions().get(action) or self._compile(action)
+        return (state & ~c.rem) | c.add
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached """
-        return all(f for f, c in zip(state, self.state_map) if c in self.goal)
+        return state & self.goal_mask == self.goal_mask
@@ -0,0 +1,141 @@
+
+from heapq import heappop, heappush
+from operator import add
+
+from _utils import set_bits as _bits
+
+INF = float("inf")
+
+
+class RelaxedPlanEngine:
+    """ Delete-relaxation heuristics (h_max, h_add and h_FF) over flat arrays
+
+    The actions of a problem are compiled once into integer lists: fact i is
+    the fluent state_map[i] being True and fact n + i is the same fluent being
+    False, so negative preconditions and delete effects are ordinary facts of
+    the relaxation (the same literals a planning graph tracks). Each heuristic
+    evaluation is then a single generalized Dijkstra pass in which every action
+    keeps a counter of its unreached preconditions and fires when the counter
+    drops to zero, as in Bonet & Geffner's HSP and Hoffmann & Nebel's FF.
+    Nothing is rebuilt per node beyond a few lists of len(facts) and
+    len(actions).
+
+    Parameters
+    ----------
+    problem : BasePlanningProblem
+        A planning problem with bitset states and compiled actions
+    """
+    def __init__(self, problem):
+        n = len(problem.state_map)
+        self.n = n
+        self.goals = list(_bits(problem.goal_mask))
+        # a goal outside state_map can never be reached
+        self.reachable = len(self.goals) == len(set(problem.goal))
+        self.actions = []
+        self.preconditions = []
+        self.effects = []
+        self.consumers = [[] for _ in range(2 * n)]
+        self.free = []
+        for c in problem.compiled_actions.values():
+            if c.pre_pos == -1:
+                continue
+            a = len(self.actions)
+            pre = list(_bits(c.pre_pos)) + [n + idx for idx in _bits(c.pre_neg)]
+            self.actions.append(c.action)
+            self.preconditions.append(pre)
+            self.effects.append(list(_bits(c.add)) + [n + idx for idx in _bits(c.rem)])
+            for fact in pre:
+                self.consumers[fact].append(a)
+            if not pre:
+                self.free.append(a)
+        self.num_preconditions = [len(pre) for pre in self.preconditions]
+
+    def _explore(self, state, combine):
+        """ Return the cost of every fact and the action that first achieves it
+
+        Exploration stops as soon as the cost of every goal is final, so facts
+        that cost more than the most expensive goal are left unexplored.
+        """
+        n = self.n
+        cost = [INF] * (2 * n)
+        supporter = [-1] * (2 * n)
+        heap = []
+        for idx in range(n):
+            fact = idx if state >> idx & 1 else n + idx
+            cost[fact] = 0
+            heap.append((0, fact))
+        remaining = list(self.num_preconditions)
+        acc = [0] * len(self.actions)
+        effects = self.effects
+        for a in self.free:
+            for fact in effects[a]:
+                if 1 < cost[fact]:
+                    cost[fact] = 1
+                    supporter[fact] = a
+                    heappush(heap, (1, fact))
+        pending = len(self.goals)
+        goals = set(self.goals)
+        consumers = self.consumers
+        while heap and pending:
+            c, fact = heappop(heap)
+            if c > cost[fact]:
+                continue
+            if fact in goals:
+                goals.discard(fact)
+                pending -= 1
+            for a in consumers[fact]:
+                acc[a] = combine(acc[a], c)
+                remaining[a] -= 1
+                if remaining[a] == 0:
+                    ca = acc[a] + 1
+                    for effect in effects[a]:
+                        if ca < cost[effect]:
+                            cost[effect] = ca
+                            supporter[effect] = a
+                            heappush(heap, (ca, effect))
+        return cost, supporter
+
+    def h_max(self, state):
+        """ Return the largest relaxed cost of any goal (admissible) """
+        if not self.reachable:
+            return INF
+        cost, _ = self._explore(state, max)
+        return max((cost[g] for g in self.goals), default=0)
+
+    def h_add(self, state):
+        """ Return the sum of the relaxed costs of the goals, counting every
+        precondition along the way as if it were achieved independently
+        """
+        if not self.reachable:
+            return INF
+        cost, _ = self._explore(state, add)
+        return sum(cost[g] for g in self.goals)
+
+    def relaxed_plan(self, state):
+        """ Return the actions of a relaxed plan for the goals, or None
+
+        The plan is extracted backwards from the goals by following the best
+        supporter of each fact under h_add, so shared subgoals are counted once.
+        """
+        if not self.reachable:
+            return None
+        cost, supporter = self._explore(state, add)
+        if any(cost[g] == INF for g in self.goals):
+            return None
+        plan, seen = set(), set()
+        stack = list(self.goals)
+        while stack:
+            fact = stack.pop()
+            if fact in seen or cost[fact] == 0:
+                continue
+            seen.add(fact)
+            a = supporter[fact]
+            if a not in plan:
+                plan.add(a)
+                stack.extend(self.preconditions[a])
+        return [self.actions[a] for a in sorted(plan)]
+
+    def h_ff(self, state):
+        """ Return the number of actions in a relaxed plan for the goals """
+        plan = self.relaxed_plan(state)
+        return INF if plan is None else len(plan)
@@ -0,0 +1,150 @@
+import unittest
+
+from itertools import combinations
+
+from _utils import decode_bitset, encode_bitset, encode_state
+from aimacode.search import Node, astar_search, greedy_best_first_graph_search
+from aimacode.utils import PriorityQueue
+from air_cargo_problems import air_cargo_p1, air_cargo_p2
+from example_have_cake import have_cake
+from my_planning_graph import PlanningGraph
+
+
+class TestBitsetStates(unittest.TestCase):
+    def setUp(self):
+        self.problem = air_cargo_p1()
+
+    def test_encoding(self):
+        fluents = decode_bitset(self.problem.initial, self.problem.state_map)
+        self.assertEqual(encode_bitset(fluents, self.problem.state_map), self.problem.initial)
+        self.assertEqual(encode_state(fluents, self.problem.state_map), self.problem.initial_state_TF)
+
+    def test_actions_and_result(self):
+        state = self.problem.initial
+        for action in self.problem.actions_list:
+            fluents = decode_bitset(state, self.problem.state_map)
+            applicable = (all(f in fluents.pos for f in action.precond_pos) and
+                          all(f in fluents.neg for f in action.precond_neg))
+            self.assertEqual(action in self.problem.actions(state), applicable)
+            if applicable:
+                succ = decode_bitset(self.problem.result(state, action), self.problem.state_map)
+                expected = (set(fluents.pos) - action.effect_rem) | action.effect_add
+                self.assertEqual(set(succ.pos), expected)
+
+    def test_precondition_index(self):
+        problem = air_cargo_p2()
+        states, frontier = set(), [problem.initial]
+        while frontier and len(states) < 200:
+            state = frontier.pop()
+            if state in states:
+                continue
+            states.add(state)
+            scan = [c.action for c in problem.compiled_actions.values()
+                    if state & c.pre_pos == c.pre_pos and not state & c.pre_neg]
+            self.assertEqual(problem.actions(state), scan)
+            frontier.extend(problem.result(state, action) for action in scan)
+
+    def test_search(self):
+        for problem, length in ((have_cake(), 2), (air_cargo_p1(), 6), (air_cargo_p2(), 9)):
+            node = astar_search(problem, problem.h_unmet_goals)
+            self.assertTrue(problem.goal_test(node.state))
+            self.assertEqual(len(node.solution()), length)
+
+
+class TestPriorityQueue(unittest.TestCase):
+    def test_incumbent_after_pop(self):
+        frontier = PriorityQueue(min, lambda node: node.path_cost)
+        best, middle, worst = Node('A', path_cost=1), Node('A', path_cost=2), Node('A', path_cost=3)
+        for node in (worst, best, middle):
+            frontier.append(node)
+        self.assertIs(frontier[Node('A')], best)
+        self.assertIs(frontier.pop(), best)
+        self.assertIs(frontier[Node('A')], middle)
+        self.assertIs(frontier.pop(), middle)
+        self.assertIs(frontier[Node('A')], worst)
+        frontier.pop()
+        self.assertNotIn(Node('A'), frontier)
+        self.assertIsNone(frontier[Node('A')])
+
+
+class TestIncrementalHeuristics(unittest.TestCase):
+    def test_stop_at_goal_level(self):
+        problem = air_cargo_p2()
+        full = PlanningGraph(problem, problem.initial).fill()
+        for heuristic, levels in (('h_levelsum', 3), ('h_maxlevel', 3), ('h_setlevel', 5)):
+            pg = PlanningGraph(problem, problem.initial, ignore_mutexes=heuristic != 'h_setlevel')
+            getattr(pg, heuristic)()
+            self.assertEqual(len(pg.literal_layers), levels)
+            self.assertLess(len(pg.literal_layers), len(full.literal_layers))
+
+    def test_goals_always_mutex(self):
+        problem = air_cargo_p2()
+        pg = PlanningGraph(problem, problem.initial)
+        pg.goal = pg.goal | {~g for g in pg.goal}
+        self.assertEqual(pg.h_setlevel(), float('inf'))
+
+
+class TestRelaxedPlanHeuristics(unittest.TestCase):
+    def setUp(self):
+        self.problem = air_cargo_p1()
+        self.node = Node(self.problem.initial)
+
+    def test_matches_planning_graph(self):
+        for problem in (have_cake(), air_cargo_p1(), air_cargo_p2()):
+            node = Node(problem.initial)
+            self.assertEqual(problem.h_max(node), problem.h_pg_maxlevel(node))
+            self.assertLessEqual(problem.h_max(node), problem.h_ff(node))
+            self.assertLessEqual(problem.h_ff(node), problem.h_add(node))
+
+    def test_relaxed_plan(self):
+        engine = self.problem.relaxed_plan_engine
+        plan = engine.relaxed_plan(self.problem.initial)
+        self.assertEqual(len(plan), 6)
+        state = self.problem.initial
+        for action in plan:
+            state |= self.problem.compiled_actions[action].add
+        self.assertTrue(self.problem.goal_test(state))
+        self.assertEqual(engine.h_ff(self.problem.goal_mask), 0)
+
+    def test_unreachable_goal(self):
+        self.problem.actions_list = [a for a in self.problem.actions_list if a.name != 'Unload']
+        self.assertEqual(self.problem.h_add(self.node), float('inf'))
+        self.assertEqual(self.problem.h_ff(self.node), float('inf'))
+
+    def test_search(self):
+        for problem, length in ((have_cake(), 2), (air_cargo_p1(), 6), (air_cargo_p2(), 9)):
+            node = astar_search(problem, problem.h_max)
+            self.assertEqual(len(node.solution()), length)
+            node = greedy_best_first_graph_search(problem, problem.h_ff)
+            self.assertTrue(problem.goal_test(node.state))
+
+
+class TestBitsetMutexes(unittest.TestCase):
+    def test_matches_pairwise_definitions(self):
+        problem = air_cargo_p1()
+        pg = PlanningGraph(problem, problem.initial).fill()
+        for layer in pg.action_layers:
+            for actionA, actionB in combinations(layer, 2):
+                expected = bool((not actionA.no_op and not actionB.no_op)
+                                or layer._inconsistent_effects(actionA, actionB)
+                                or layer._interference(actionA, actionB)
+                                or layer._competing_needs(actionA, actionB))
+                self.assertEqual(layer.is_mutex(actionA, actionB), expected)
+                self.assertEqual(layer.is_mutex(actionB, actionA), expected)
+        for layer in pg.literal_layers[1:]:
+            for literalA, literalB in combinations(layer, 2):
+                expected = bool(layer._negation(literalA, literalB)
+                                or layer._inconsistent_support(literalA, literalB))
+                self.assertEqual(layer.is_mutex(literalA, literalB), expected)
+
+    def test_shared_index(self):
+        problem = air_cargo_p1()
+        first = PlanningGraph(problem, problem.initial).fill()
+        numbered = len(problem.node_index._ids)
+        PlanningGraph(problem, problem.initial).fill()
+        self.assertEqual(len(problem.node_index._ids), numbered)
+        self.assertIs(first.literal_layers[-1]._index, problem.node_index)
+
+
+if __name__ == '__main__':
+    unittest.main()